@@ -24,6 +24,7 @@ from util import *
 import time, os
 import traceback
 import sys
+import random
 
 #######################
 # Parts worth reading #
@@ -75,6 +76,8 @@ class Configuration:
     The convention for positions, like a graph, is that (0,0) is the lower left corner, x increases
     horizontally and y increases vertically.  Therefore, north is the direction of increasing y, or (0,1).
     """
+    # Every successor state creates configurations, slots keep them small
+    __slots__ = ('pos', 'direction')
 
     def __init__(self, pos, direction):
         self.pos = pos
@@ -121,6 +124,7 @@ class AgentState:
     """
     AgentStates hold the state of an agent (configuration, speed, scared, etc).
     """
+    __slots__ = ('start', 'configuration', 'isPacman', 'scaredTimer', 'numCarrying', 'numReturned')
 
     def __init__( self, startConfiguration, isPacman ):
         self.start = startConfiguration
@@ -167,9 +171,12 @@ class Grid:
 
     The __str__ method constructs an output that is oriented like a pacman board.
     """
+    # Subclasses declare their own slots too, or they get a __dict__ again
+    __slots__ = ('width', 'height', 'data')
+    CELLS_PER_INT = 30
+
     def __init__(self, width, height, initialValue=False, bitRepresentation=None):
         if initialValue not in [False, True]: raise Exception('Grids can only contain booleans')
-        self.CELLS_PER_INT = 30
 
         self.width = width
         self.height = height
@@ -180,6 +187,14 @@ class Grid:
     def __getitem__(self, i):
         return self.data[i]
 
+    def __setstate__(self, state):
+        "Unpickles grids, also those pickled before grids had slots (a __dict__)"
+        if isinstance(state, tuple):
+            state = state[1]
+        for name, value in state.items():
+            if name != 'CELLS_PER_INT':
+                setattr(self, name, value)
+
     def __setitem__(self, key, item):
         self.data[key] = item
 
@@ -194,14 +209,12 @@ class Grid:
 
     def __hash__(self):
         # return hash(str(self))
-        base = 1
-        h = 0
-        for l in self.data:
-            for i in l:
-                if i:
-                    h += base
-                base *= 2
-        return hash(h)
+        return hash(self._asInt())
+
+    def _asInt(self):
+        "Returns the cells as the bits of an int: cell (x,y) is bit x * height + y"
+        digits = ''.join([''.join(['1' if cell else '0' for cell in column]) for column in self.data])
+        return int(digits[::-1], 2) if digits else 0
 
     def copy(self):
         g = Grid(self.width, self.height)
@@ -228,22 +241,12 @@ class Grid:
 
     def packBits(self):
         """
-        Returns an efficient int list representation
+        Returns an efficient bytes representation
 
-        (width, height, bitPackedInts...)
+        (width, height, bytes) where cell (x,y) is bit x * height + y of the
+        little endian bytes, see reconstituteGrid
         """
-        bits = [self.width, self.height]
-        currentInt = 0
-        for i in range(self.height * self.width):
-            bit = self.CELLS_PER_INT - (i % self.CELLS_PER_INT) - 1
-            x, y = self._cellIndexToPosition(i)
-            if self[x][y]:
-                currentInt += 2 ** bit
-            if (i + 1) % self.CELLS_PER_INT == 0:
-                bits.append(currentInt)
-                currentInt = 0
-        bits.append(currentInt)
-        return tuple(bits)
+        return (self.width, self.height, self._asInt().to_bytes((self.width * self.height + 7) // 8, 'little'))
 
     def _cellIndexToPosition(self, index):
         x = index // self.height
@@ -254,27 +257,250 @@ class Grid:
         """
         Fills in data from a bit-level representation
         """
-        cell = 0
-        for packed in bits:
-            for bit in self._unpackInt(packed, self.CELLS_PER_INT):
-                if cell == self.width * self.height: break
-                x, y = self._cellIndexToPosition(cell)
-                self[x][y] = bit
-                cell += 1
-
-    def _unpackInt(self, packed, size):
-        bools = []
+        cells = self.width * self.height
+        packed = unpackBitRepresentation(bits, cells, self.CELLS_PER_INT)
+        digits = bin(packed)[:1:-1].ljust(cells, '0')
+        height = self.height
+        self.data = [[digit == '1' for digit in digits[x * height:(x + 1) * height]] for x in range(self.width)]
+
+class BitGrid(Grid):
+    """
+    A Grid of booleans stored as the bits of a single int: cell (x,y) is bit
+    x * height + y, the order of packBits and of Grid.__hash__.
+
+    Copying only copies the (immutable) int, hashing and counting work on
+    the int directly and grid[x][y] reads and writes a single bit, so
+    BitGrid can replace a boolean Grid wherever grids are copied and hashed
+    a lot.  It is only used for the food of GameStateData, which is copied
+    on every eaten dot: grid[x][y] goes through a BitGridColumn and is
+    several times slower than reading a Grid, so grids that are mostly read,
+    like the walls, stay Grids (search states use searchAgents.FoodSet).
+    """
+    __slots__ = ('bits',)
+
+    def __init__(self, width, height, initialValue=False, bitRepresentation=None):
+        if initialValue not in [False, True]: raise Exception('Grids can only contain booleans')
+
+        self.width = width
+        self.height = height
+        self.bits = (1 << (width * height)) - 1 if initialValue else 0
+        if bitRepresentation:
+            self._unpackBits(bitRepresentation)
+
+    def __getitem__(self, i):
+        if not -self.width <= i < self.width:
+            raise IndexError('grid column out of range')
+        return BitGridColumn(self, i % self.width)
+
+    def __setitem__(self, key, item):
+        if not -self.width <= key < self.width:
+            raise IndexError('grid column out of range')
+        if len(item) != self.height:
+            raise ValueError('a column of the grid needs %d cells' % self.height)
+        column = BitGridColumn(self, key % self.width)
+        for y in range(self.height):
+            column[y] = item[y]
+
+    def __str__(self):
+        out = [[str(self[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def __eq__(self, other):
+        if other == None: return False
+        if not isinstance(other, BitGrid):
+            # compare bits, other.data may be a NumPy array whose == is elementwise
+            return other.width == self.width and other.height == self.height and \
+                   toBitGrid(other).bits == self.bits
+        return self.bits == other.bits and self.width == other.width and self.height == other.height
+
+    def __hash__(self):
+        # the same value as the hash of an equal Grid
+        return hash(self.bits)
+
+    def copy(self):
+        g = BitGrid(self.width, self.height)
+        g.bits = self.bits
+        return g
+
+    def deepCopy(self):
+        return self.copy()
+
+    def shallowCopy(self):
+        # an int cannot be shared for writing, writes never leak between copies
+        return self.copy()
+
+    def packBits(self):
+        return (self.width, self.height, self.bits.to_bytes((self.width * self.height + 7) // 8, 'little'))
+
+    def _unpackBits(self, bits):
+        self.bits = unpackBitRepresentation(bits, self.width * self.height, self.CELLS_PER_INT)
+
+    def count(self, item =True ):
+        trueCount = self.bits.bit_count()
+        return trueCount if item else self.width * self.height - trueCount
+
+    def asList(self, key = True):
+        cells = self.width * self.height
+        if self.count(key) * 16 < cells:
+            # few cells: jump from one set bit to the next
+            bits = self.bits if key else ~self.bits & ((1 << cells) - 1)
+            list = []
+            while bits:
+                lowest = bits & -bits
+                list.append(self._cellIndexToPosition(lowest.bit_length() - 1))
+                bits ^= lowest
+            return list
+        # many cells: scan the binary digits of the int, lowest bit (cell 0) first
+        digits = bin(self.bits)[:1:-1].ljust(cells, '0')
+        digit = '1' if key else '0'
+        height = self.height
+        return [(i // height, i % height) for i, d in enumerate(digits) if d == digit]
+
+class BitGridColumn:
+    "The column x of a BitGrid, so that grid[x][y] can read and write single bits"
+    __slots__ = ('grid', 'offset')
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.offset = x * grid.height
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.grid.height:
+            raise IndexError('grid row out of range')
+        return (self.grid.bits >> (self.offset + y)) & 1 == 1
+
+    def __setitem__(self, y, value):
+        if not 0 <= y < self.grid.height:
+            raise IndexError('grid row out of range')
+        if value:
+            self.grid.bits |= 1 << (self.offset + y)
+        else:
+            self.grid.bits &= ~(1 << (self.offset + y))
+
+    def __len__(self):
+        return self.grid.height
+
+def toBitGrid(grid):
+    "Returns a BitGrid with the same cells as a boolean Grid"
+    bitGrid = BitGrid(grid.width, grid.height)
+    bits = 0
+    for x in range(grid.width - 1, -1, -1):
+        for y in range(grid.height - 1, -1, -1):
+            bits = (bits << 1) | (1 if grid[x][y] else 0)
+    bitGrid.bits = bits
+    return bitGrid
+
+try:
+    import numpy
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+class NumpyGrid(Grid):
+    """
+    A Grid of booleans backed by a NumPy array of shape (width, height), so
+    grid[x][y] still works.  Whole-board operations (count, asList, hashing,
+    copying and packing bits) are vectorized instead of looping over every
+    cell in Python, which pays off on big boards.  Reading single cells is
+    slower than with a list of lists.
+
+    asArray returns the array itself for analysis code.  Only available if
+    NumPy is installed (see NUMPY_AVAILABLE).
+    """
+    __slots__ = ()
+
+    def __init__(self, width, height, initialValue=False, bitRepresentation=None):
+        if initialValue not in [False, True]: raise Exception('Grids can only contain booleans')
+        if not NUMPY_AVAILABLE: raise Exception('NumpyGrid needs NumPy, which is not installed')
+
+        self.width = width
+        self.height = height
+        self.data = numpy.full((width, height), initialValue, dtype=bool)
+        if bitRepresentation:
+            self._unpackBits(bitRepresentation)
+
+    def asArray(self):
+        "The boolean array of the grid, indexed [x, y]; writes to it change the grid"
+        return self.data
+
+    def __str__(self):
+        out = numpy.where(self.data.T[::-1], 'T', 'F')
+        return '\n'.join([''.join(row) for row in out])
+
+    def __eq__(self, other):
+        if other == None: return False
+        if isinstance(other, NumpyGrid):
+            return numpy.array_equal(self.data, other.data)
+        return self.width == other.width and self.height == other.height and \
+               self.asList() == other.asList()
+
+    def __hash__(self):
+        # the same value as the hash of an equal Grid: cell (x,y) is bit x * height + y
+        packed = numpy.packbits(self.data.ravel(), bitorder='little')
+        return hash(int.from_bytes(packed.tobytes(), 'little'))
+
+    def copy(self):
+        g = NumpyGrid(self.width, self.height)
+        g.data = self.data.copy()
+        return g
+
+    def shallowCopy(self):
+        g = NumpyGrid(self.width, self.height)
+        g.data = self.data
+        return g
+
+    def count(self, item =True ):
+        trueCount = int(numpy.count_nonzero(self.data))
+        return trueCount if item else self.data.size - trueCount
+
+    def asList(self, key = True):
+        xs, ys = numpy.nonzero(self.data == bool(key))
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def packBits(self):
+        packed = numpy.packbits(self.data.ravel(), bitorder='little')
+        return (self.width, self.height, packed.tobytes())
+
+    def _unpackBits(self, bits):
+        """
+        Fills in data from a bit-level representation
+        """
+        if len(bits) == 1 and isinstance(bits[0], (bytes, bytearray)):
+            bits = bits[0]
+        if isinstance(bits, (bytes, bytearray)):
+            cells = numpy.unpackbits(numpy.frombuffer(bits, dtype=numpy.uint8), bitorder='little',
+                                     count=self.width * self.height).astype(bool)
+        else:
+            # the legacy format, cellsPerInt cells per int with the first one in the highest bit
+            packed = numpy.array(bits, dtype=numpy.int64)
+            if (packed < 0).any(): raise ValueError("must be a positive integer")
+            shifts = numpy.arange(self.CELLS_PER_INT - 1, -1, -1, dtype=numpy.int64)
+            cells = ((packed[:, None] >> shifts) & 1).astype(bool).ravel()[:self.width * self.height]
+        self.data = cells.reshape(self.width, self.height).copy()
+
+def unpackBitRepresentation(bits, cells, cellsPerInt=30):
+    """
+    Returns the first cells cells of a bit representation as the bits of an
+    int (cell i is bit i).  The representation is either the bytes of
+    packBits or, in the legacy format of older packBits, a sequence of ints
+    that hold cellsPerInt cells each, the first one in the highest bit.
+    """
+    if len(bits) == 1 and isinstance(bits[0], (bytes, bytearray)):
+        bits = bits[0]
+    if isinstance(bits, (bytes, bytearray)):
+        return int.from_bytes(bits, 'little') & ((1 << cells) - 1)
+    for packed in bits:
         if packed < 0: raise ValueError("must be a positive integer")
-        for i in range(size):
-            n = 2 ** (self.CELLS_PER_INT - i - 1)
-            if packed >= n:
-                bools.append(True)
-                packed -= n
-            else:
-                bools.append(False)
-        return bools
+    digits = ''.join([format(packed, '0%db' % cellsPerInt) for packed in bits])[:cells]
+    return int(digits[::-1], 2) if digits else 0
 
 def reconstituteGrid(bitRep):
+    """
+    Returns the Grid of a packBits representation (width, height, bytes) or of
+    the legacy one (width, height, bitPackedInts...); anything else is
+    returned as it is.
+    """
     if type(bitRep) is not type((1,2)):
         return bitRep
     width, height = bitRep[:2]
@@ -368,21 +594,60 @@ class Actions:
         return (x + dx, y + dy)
     getSuccessor = staticmethod(getSuccessor)
 
+ZOBRIST_KEYS = {}  # feature of a game state -> its random 64 bit key
+_zobristRandom = random.Random(188)  # the same keys in every run
+
+def zobristKey(feature):
+    "Returns the random key of a (hashable) feature, like ('food', x, y)"
+    key = ZOBRIST_KEYS.get(feature)
+    if key == None:
+        key = ZOBRIST_KEYS[feature] = _zobristRandom.getrandbits(64)
+    return key
+
+def agentStateKey(index, agentState):
+    "The Zobrist key of the agent with the given index in the given AgentState"
+    if agentState == None or agentState.configuration == None:
+        return zobristKey(('agent', index, None))
+    configuration = agentState.configuration
+    return zobristKey(('agent', index, configuration.pos, configuration.direction, agentState.scaredTimer))
+
 class GameStateData:
     """
-
+    The data of a game state.  Its hash is a Zobrist hash: the XOR of the
+    keys of all food cells, capsules and agent states (see zobristKey),
+    which the rules in pacman.py update when they change one of them
+    instead of hashing the whole state again.
+
+    Successors share the food, capsules and agent states of their
+    predecessor and only copy what they change (copy on write): eatFood,
+    eatCapsule and _writableAgentState make the copies, so the rules must
+    use them instead of changing shared objects.
+
+    A GameStateData is made for every successor, so it has slots instead
+    of a __dict__; new fields must be added to __slots__.
     """
+    __slots__ = ('food', 'capsules', 'agentStates', 'layout', 'score', 'scoreChange',
+                 'numFood', '_foodPositions', 'capsulePositions',
+                 '_eaten', '_zobrist', '_agentKeys', '_copiedAgents',
+                 '_foodEaten', '_foodAdded', '_capsuleEaten', '_agentMoved', '_lose', '_win')
+
     def __init__( self, prevState = None ):
         """
         Generates a new data packet by copying information from its predecessor.
         """
         if prevState != None:
-            self.food = prevState.food.shallowCopy()
-            self.capsules = prevState.capsules[:]
-            self.agentStates = self.copyAgentStates( prevState.agentStates )
+            self.food = prevState.food  # shared until eatFood
+            self.capsules = prevState.capsules  # shared until eatCapsule
+            self.agentStates = prevState.agentStates  # shared until _writableAgentState
             self.layout = prevState.layout
             self._eaten = prevState._eaten
             self.score = prevState.score
+            self._zobrist = prevState._zobrist
+            self.numFood = prevState.numFood
+            self._foodPositions = prevState._foodPositions  # frozensets, safe to share
+            self.capsulePositions = prevState.capsulePositions
+            self._agentKeys = prevState._agentKeys  # shared with agentStates
+            self._copiedAgents = None  # the indices of the agent states this data copied
 
         self._foodEaten = None
         self._foodAdded = None
@@ -395,6 +660,11 @@ class GameStateData:
     def deepCopy( self ):
         state = GameStateData( self )
         state.food = self.food.deepCopy()
+        state.capsules = self.capsules[:]
+        state.agentStates = self.copyAgentStates( self.agentStates )
+        state._agentKeys = self._agentKeys[:]
+        state._copiedAgents = set( range( len( self.agentStates ) ) )
+        state._eaten = self._eaten[:]
         state.layout = self.layout.deepCopy()
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
@@ -408,12 +678,79 @@ class GameStateData:
             copiedStates.append( agentState.copy() )
         return copiedStates
 
+    def _writableAgentState( self, index ):
+        """
+        Returns the AgentState of the agent with the given index, copied first
+        if it is still shared with the predecessor, so it can be changed.
+        """
+        if self._copiedAgents == None:
+            self.agentStates = self.agentStates[:]
+            self._agentKeys = self._agentKeys[:]
+            self._copiedAgents = set()
+        if index not in self._copiedAgents:
+            self.agentStates[index] = self.agentStates[index].copy()
+            self._copiedAgents.add( index )
+        return self.agentStates[index]
+
+    def updateAgentHash( self, index ):
+        "Updates the hash after the agent with the given index has changed"
+        self._writableAgentState( index )
+        key = agentStateKey( index, self.agentStates[index] )
+        self._zobrist ^= self._agentKeys[index] ^ key
+        self._agentKeys[index] = key
+
+    def eatFood( self, position ):
+        "Removes the food at position, keeping the food count, positions and hash up to date"
+        x, y = position
+        self.food = self.food.copy()
+        self.food[x][y] = False
+        self.numFood -= 1
+        self._foodPositions = None  # derived from the grid again if anyone asks
+        self.toggleFoodHash( position )
+
+    def getFoodPositions( self ):
+        """
+        Returns a frozenset of the food positions.  It is derived from the food
+        grid the first time it is asked for after the food changed, so eating
+        stays O(1) for the many states nobody asks.
+        """
+        if self._foodPositions == None:
+            self._foodPositions = frozenset( self.food.asList() )
+        return self._foodPositions
+
+    def eatCapsule( self, position ):
+        "Removes the capsule at position, keeping the capsule positions and hash up to date"
+        self.capsules = [capsule for capsule in self.capsules if capsule != position]
+        self.capsulePositions = self.capsulePositions - {position}
+        self.toggleCapsuleHash( position )
+
+    def toggleFoodHash( self, position ):
+        "Updates the hash after food was removed from (or added to) position"
+        self._zobrist ^= zobristKey( ('food',) + tuple(position) )
+
+    def toggleCapsuleHash( self, position ):
+        "Updates the hash after a capsule was removed from (or added to) position"
+        self._zobrist ^= zobristKey( ('capsule',) + tuple(position) )
+
+    def rehash( self ):
+        "Computes the hash from scratch, after the food, capsules or agents were replaced"
+        self._zobrist = 0
+        for position in self.food.asList():
+            self.toggleFoodHash( position )
+        for position in self.capsules:
+            self.toggleCapsuleHash( position )
+        self._agentKeys = [agentStateKey( index, agentState ) for index, agentState in enumerate( self.agentStates )]
+        for key in self._agentKeys:
+            self._zobrist ^= key
+
     def __eq__( self, other ):
         """
         Allows two states to be compared.
         """
         if other == None: return False
         # TODO Check for type of other
+        # states with different hashes cannot be equal
+        if self._zobrist != other._zobrist: return False
         if not self.agentStates == other.agentStates: return False
         if not self.food == other.food: return False
         if not self.capsules == other.capsules: return False
@@ -424,13 +761,7 @@ class GameStateData:
         """
         Allows states to be keys of dictionaries.
         """
-        for i, state in enumerate( self.agentStates ):
-            try:
-                int(hash(state))
-            except TypeError as e:
-                print(e)
-                #hash(state)
-        return int((hash(tuple(self.agentStates)) + 13*hash(self.food) + 113* hash(tuple(self.capsules)) + 7 * hash(self.score)) % 1048575 )
+        return hash( (self._zobrist, self.score) )
 
     def __str__( self ):
         width, height = self.layout.width, self.layout.height
@@ -488,7 +819,7 @@ class GameStateData:
         """
         Creates an initial game state from a layout array (see layout.py).
         """
-        self.food = layout.food.copy()
+        self.food = toBitGrid(layout.food)  # copied on every eaten dot, see BitGrid
         #self.capsules = []
         self.capsules = layout.capsules[:]
         self.layout = layout
@@ -503,6 +834,11 @@ class GameStateData:
                 else: numGhosts += 1
             self.agentStates.append( AgentState( Configuration( pos, Directions.STOP), isPacman) )
         self._eaten = [False for a in self.agentStates]
+        self._copiedAgents = set( range( len( self.agentStates ) ) )
+        self.numFood = self.food.count()
+        self._foodPositions = None
+        self.capsulePositions = frozenset( self.capsules )
+        self.rehash()
 
 try:
     import boinc
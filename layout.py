@@ -14,6 +14,7 @@
 
 from util import manhattanDistance
 from game import Grid
+import game
 import os
 import random
 from functools import reduce
@@ -25,15 +26,21 @@ class Layout:
     A Layout manages the static information about the game board.
     """
 
-    def __init__(self, layoutText):
+    def __init__(self, layoutText, useNumpy=False):
         self.width = len(layoutText[0])
         self.height= len(layoutText)
-        self.walls = Grid(self.width, self.height, False)
-        self.food = Grid(self.width, self.height, False)
+        # NumpyGrids are only used if asked for and NumPy is installed
+        self.useNumpy = useNumpy and game.NUMPY_AVAILABLE
+        gridType = game.NumpyGrid if self.useNumpy else Grid
+        self.walls = gridType(self.width, self.height, False)
+        self.food = gridType(self.width, self.height, False)
         self.capsules = []
         self.agentPositions = []
         self.numGhosts = 0
-        self.processLayoutText(layoutText)
+        if self.useNumpy:
+            self.processLayoutArray(layoutText)
+        else:
+            self.processLayoutText(layoutText)
         self.layoutText = layoutText
         self.totalFood = len(self.food.asList())
         # self.initializeVisibilityMatrix()
@@ -91,7 +98,7 @@ class Layout:
         return "\n".join(self.layoutText)
 
     def deepCopy(self):
-        return Layout(self.layoutText[:])
+        return Layout(self.layoutText[:], self.useNumpy)
 
     def processLayoutText(self, layoutText):
         """
@@ -114,6 +121,37 @@ class Layout:
         self.agentPositions.sort()
         self.agentPositions = [ ( i == 0, pos) for i, pos in self.agentPositions]
 
+    def processLayoutArray(self, layoutText):
+        """
+        processLayoutText for NumpyGrids: finds the cells of every character
+        with array operations instead of calling processLayoutChar per cell.
+        """
+        import numpy
+        # chars[x, y] is the character at (x, y)
+        # (like processLayoutText, characters beyond the width of the first row are ignored)
+        text = ''.join([row[:self.width] for row in layoutText]).encode('latin-1')
+        chars = numpy.frombuffer(text, dtype='S1').reshape(self.height, self.width)[::-1].T
+        self.walls.data = chars == b'%'
+        self.food.data = chars == b'.'
+
+        # the remaining characters are few, the order matches processLayoutText
+        def positions(mask):
+            ys, xs = numpy.nonzero(mask.T)
+            return list(zip(xs.tolist(), ys.tolist()))
+        self.capsules = positions(chars == b'o')
+        for x, y in positions(numpy.isin(chars, [b'P', b'G', b'1', b'2', b'3', b'4'])):
+            layoutChar = chars[x, y].decode()
+            if layoutChar == 'P':
+                self.agentPositions.append( (0, (x, y) ) )
+            elif layoutChar == 'G':
+                self.agentPositions.append( (1, (x, y) ) )
+                self.numGhosts += 1
+            else:
+                self.agentPositions.append( (int(layoutChar), (x,y)))
+                self.numGhosts += 1
+        self.agentPositions.sort()
+        self.agentPositions = [ ( i == 0, pos) for i, pos in self.agentPositions]
+
     def processLayoutChar(self, x, y, layoutChar):
         if layoutChar == '%':
             self.walls[x][y] = True
@@ -129,22 +167,22 @@ class Layout:
         elif layoutChar in  ['1', '2', '3', '4']:
             self.agentPositions.append( (int(layoutChar), (x,y)))
             self.numGhosts += 1
-def getLayout(name, back = 2):
+def getLayout(name, back = 2, useNumpy = False):
     if name.endswith('.lay'):
-        layout = tryToLoad('layouts/' + name)
-        if layout == None: layout = tryToLoad(name)
+        layout = tryToLoad('layouts/' + name, useNumpy)
+        if layout == None: layout = tryToLoad(name, useNumpy)
     else:
-        layout = tryToLoad('layouts/' + name + '.lay')
-        if layout == None: layout = tryToLoad(name + '.lay')
+        layout = tryToLoad('layouts/' + name + '.lay', useNumpy)
+        if layout == None: layout = tryToLoad(name + '.lay', useNumpy)
     if layout == None and back >= 0:
         curdir = os.path.abspath('.')
         os.chdir('..')
-        layout = getLayout(name, back -1)
+        layout = getLayout(name, back -1, useNumpy)
         os.chdir(curdir)
     return layout
 
-def tryToLoad(fullname):
+def tryToLoad(fullname, useNumpy = False):
     if(not os.path.exists(fullname)): return None
     f = open(fullname)
-    try: return Layout([line.strip() for line in f])
+    try: return Layout([line.strip() for line in f], useNumpy)
     finally: f.close()
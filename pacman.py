@@ -43,10 +43,12 @@ from game import GameStateData
 from game import Game
 from game import Directions
 from game import Actions
+from game import Configuration
 from util import nearestPoint
 from util import manhattanDistance
-import util, layout
+import util, layout, game
 import sys, types, time, random, os
+import contextlib
 
 ###################################################
 # YOUR INTERFACE TO THE PACMAN WORLD: A GameState #
@@ -71,14 +73,83 @@ class GameState:
     # Accessor methods: use these to access state data #
     ####################################################
 
-    # static variable keeps track of which states have had getLegalActions called
+    # static variables keep track of which states have had generateSuccessor
+    # called; off by default, see setExploredTracking and trackExplored
     explored = set()
+    exploredTracking = None   # None (off), 'counts' or 'sample'
+    exploredSampleSize = 1000 # the most states explored holds in 'sample' mode
+    exploredCount = 0         # the generateSuccessor calls since the last reset
+    EXPLORED_TRACKING_MODES = [None, 'counts', 'sample']
+
+    # The reservoir behind explored in 'sample' mode: the sampled states in
+    # a list, how many states were offered to it and a random generator of its
+    # own, so sampling does not change the games played with a fixed seed
+    _exploredSample = []
+    _exploredOffered = 0
+    _exploredRandom = random.Random('explored')
+
     def getAndResetExplored():
         tmp = GameState.explored.copy()
         GameState.explored = set()
+        GameState.exploredCount = 0
+        GameState._exploredSample = []
+        GameState._exploredOffered = 0
         return tmp
     getAndResetExplored = staticmethod(getAndResetExplored)
 
+    def setExploredTracking( mode, sampleSize=1000 ):
+        """
+        Sets what generateSuccessor records: nothing (None, the default),
+        only exploredCount ('counts') or also a uniform sample of at most
+        sampleSize of the predecessors and successors in explored ('sample').
+        A sample larger than a new sampleSize drops the states it holds last.
+        """
+        if mode not in GameState.EXPLORED_TRACKING_MODES:
+            raise Exception('Unknown explored tracking mode: ' + str(mode))
+        GameState.exploredTracking = mode
+        GameState.exploredSampleSize = sampleSize
+        sample = GameState._exploredSample
+        while len(sample) > sampleSize:
+            GameState.explored.discard(sample.pop())
+    setExploredTracking = staticmethod(setExploredTracking)
+
+    def sampleExplored( state ):
+        """
+        Offers state to the explored sample (reservoir sampling): every state
+        offered since the last reset that is not in the sample already gets
+        the same chance to be in it, and it never holds more than
+        exploredSampleSize states.
+        """
+        if state in GameState.explored: return
+        GameState._exploredOffered += 1
+        sample = GameState._exploredSample
+        if len(sample) < GameState.exploredSampleSize:
+            sample.append(state)
+        else:
+            index = GameState._exploredRandom.randrange(GameState._exploredOffered)
+            if index >= len(sample): return
+            GameState.explored.discard(sample[index])
+            sample[index] = state
+        GameState.explored.add(state)
+    sampleExplored = staticmethod(sampleExplored)
+
+    def trackExplored( mode='sample', sampleSize=1000 ):
+        """
+        A context manager that tracks explored states (see
+        setExploredTracking) in a with block:
+
+        with GameState.trackExplored('counts'):
+            ...
+        print(GameState.exploredCount)
+        """
+        previous = GameState.exploredTracking, GameState.exploredSampleSize
+        GameState.setExploredTracking( mode, sampleSize )
+        try:
+            yield
+        finally:
+            GameState.setExploredTracking( *previous )
+    trackExplored = staticmethod(contextlib.contextmanager(trackExplored))
+
     def getLegalActions( self, agentIndex=0 ):
         """
         Returns the legal actions for the agent specified.
@@ -112,7 +183,8 @@ class GameState:
         if agentIndex == 0:
             state.data.scoreChange += -TIME_PENALTY # Penalty for waiting around
         else:
-            GhostRules.decrementTimer( state.data.agentStates[agentIndex] )
+            GhostRules.decrementTimer( state.data._writableAgentState( agentIndex ) )
+            state.data.updateAgentHash( agentIndex )
 
         # Resolve multi-agent effects
         GhostRules.checkDeath( state, agentIndex )
@@ -120,8 +192,12 @@ class GameState:
         # Book keeping
         state.data._agentMoved = agentIndex
         state.data.score += state.data.scoreChange
-        GameState.explored.add(self)
-        GameState.explored.add(state)
+        if GameState.exploredTracking != None:
+            GameState.exploredCount += 1
+            # only a sample, so the set (and the hashing) stays bounded
+            if GameState.exploredTracking == 'sample':
+                GameState.sampleExplored(self)
+                GameState.sampleExplored(state)
         return state
 
     def getLegalPacmanActions( self ):
@@ -146,12 +222,13 @@ class GameState:
         return self.data.agentStates[0].getPosition()
 
     def getGhostStates( self ):
-        return self.data.agentStates[1:]
+        "Returns copies of the ghosts' AgentStates, which may be shared with other states"
+        return [s.copy() for s in self.data.agentStates[1:]]
 
     def getGhostState( self, agentIndex ):
         if agentIndex == 0 or agentIndex >= self.getNumAgents():
             raise Exception("Invalid index passed to getGhostState")
-        return self.data.agentStates[agentIndex]
+        return self.data.agentStates[agentIndex].copy()
 
     def getGhostPosition( self, agentIndex ):
         if agentIndex == 0:
@@ -159,7 +236,7 @@ class GameState:
         return self.data.agentStates[agentIndex].getPosition()
 
     def getGhostPositions(self):
-        return [s.getPosition() for s in self.getGhostStates()]
+        return [s.getPosition() for s in self.data.agentStates[1:]]
 
     def getNumAgents( self ):
         return len( self.data.agentStates )
@@ -174,7 +251,17 @@ class GameState:
         return self.data.capsules
 
     def getNumFood( self ):
-        return self.data.food.count()
+        return self.data.numFood
+
+    def getFoodPositions( self ):
+        """
+        Returns a (frozen) set of the positions (x,y) of the remaining food.
+        It is built from the food Grid once and kept until the food changes.
+        """
+        return self.data.getFoodPositions()
+
+    def hasCapsule( self, x, y ):
+        return (x, y) in self.data.capsulePositions
 
     def getFood(self):
         """
@@ -342,11 +429,12 @@ class PacmanRules:
         if action not in legal:
             raise Exception("Illegal action " + str(action))
 
-        pacmanState = state.data.agentStates[0]
+        pacmanState = state.data._writableAgentState( 0 )
 
         # Update Configuration
         vector = Actions.directionToVector( action, PacmanRules.PACMAN_SPEED )
         pacmanState.configuration = pacmanState.configuration.generateSuccessor( vector )
+        state.data.updateAgentHash( 0 )
 
         # Eat
         next = pacmanState.configuration.getPosition()
@@ -357,25 +445,25 @@ class PacmanRules:
     applyAction = staticmethod( applyAction )
 
     def consume( position, state ):
-        x,y = position
         # Eat food
+        x, y = position
         if state.data.food[x][y]:
             state.data.scoreChange += 10
-            state.data.food = state.data.food.copy()
-            state.data.food[x][y] = False
+            state.data.eatFood( position )
             state.data._foodEaten = position
-            # TODO: cache numFood?
+            # the food count is kept up to date by eatFood
             numFood = state.getNumFood()
             if numFood == 0 and not state.data._lose:
                 state.data.scoreChange += 500
                 state.data._win = True
         # Eat capsule
-        if( position in state.getCapsules() ):
-            state.data.capsules.remove( position )
+        if( position in state.data.capsulePositions ):
+            state.data.eatCapsule( position )
             state.data._capsuleEaten = position
             # Reset all ghosts' scared timers
             for index in range( 1, len( state.data.agentStates ) ):
-                state.data.agentStates[index].scaredTimer = SCARED_TIME
+                state.data._writableAgentState( index ).scaredTimer = SCARED_TIME
+                state.data.updateAgentHash( index )
     consume = staticmethod( consume )
 
 class GhostRules:
@@ -388,7 +476,7 @@ class GhostRules:
         Ghosts cannot stop, and cannot turn around unless they
         reach a dead end, but can turn 90 degrees at intersections.
         """
-        conf = state.getGhostState( ghostIndex ).configuration
+        conf = state.data.agentStates[ghostIndex].configuration
         possibleActions = Actions.getPossibleActions( conf, state.data.layout.walls )
         reverse = Actions.reverseDirection( conf.direction )
         if Directions.STOP in possibleActions:
@@ -404,17 +492,20 @@ class GhostRules:
         if action not in legal:
             raise Exception("Illegal ghost action " + str(action))
 
-        ghostState = state.data.agentStates[ghostIndex]
+        ghostState = state.data._writableAgentState( ghostIndex )
         speed = GhostRules.GHOST_SPEED
         if ghostState.scaredTimer > 0: speed /= 2.0
         vector = Actions.directionToVector( action, speed )
         ghostState.configuration = ghostState.configuration.generateSuccessor( vector )
+        state.data.updateAgentHash( ghostIndex )
     applyAction = staticmethod( applyAction )
 
     def decrementTimer( ghostState):
         timer = ghostState.scaredTimer
         if timer == 1:
-            ghostState.configuration.pos = nearestPoint( ghostState.configuration.pos )
+            # a new Configuration: the old one is shared with the previous state (and its hash)
+            ghostState.configuration = Configuration( nearestPoint( ghostState.configuration.pos ),
+                                                      ghostState.configuration.direction )
         ghostState.scaredTimer = max( 0, timer - 1 )
     decrementTimer = staticmethod( decrementTimer )
 
@@ -436,9 +527,12 @@ class GhostRules:
     def collide( state, ghostState, agentIndex):
         if ghostState.scaredTimer > 0:
             state.data.scoreChange += 200
+            ghostState = state.data._writableAgentState( agentIndex )
             GhostRules.placeGhost(state, ghostState)
             ghostState.scaredTimer = 0
-            # Added for first-person
+            state.data.updateAgentHash( agentIndex )
+            # Added for first-person; the list may be shared with the predecessor
+            state.data._eaten = state.data._eaten[:]
             state.data._eaten[agentIndex] = True
         else:
             if not state.data._win:
@@ -523,6 +617,12 @@ def readCommand( argv ):
                       help='Turns on exception handling and timeouts during games', default=False)
     parser.add_option('--timeout', dest='timeout', type='int',
                       help=default('Maximum length of time an agent can spend computing in a single game'), default=30)
+    parser.add_option('--trackExplored', dest='trackExplored', default=None,
+                      help='Track the states agents generate successors of: counts or sample [Default: off]')
+    parser.add_option('--exploredSampleSize', dest='exploredSampleSize', type='int',
+                      help=default('The most states --trackExplored sample keeps'), default=1000)
+    parser.add_option('--numpyGrids', action='store_true', dest='numpyGrids', default=False,
+                      help='Build the walls and food of the layout as NumPy arrays (needs NumPy)')
 
     options, otherjunk = parser.parse_args(argv)
     if len(otherjunk) != 0:
@@ -532,8 +632,13 @@ def readCommand( argv ):
     # Fix the random seed
     if options.fixRandomSeed: random.seed('cs188')
 
+    # Track explored states
+    GameState.setExploredTracking( options.trackExplored, options.exploredSampleSize )
+
     # Choose a layout
-    args['layout'] = layout.getLayout( options.layout )
+    if options.numpyGrids and not game.NUMPY_AVAILABLE:
+        raise Exception("--numpyGrids needs NumPy, which is not installed")
+    args['layout'] = layout.getLayout( options.layout, useNumpy=options.numpyGrids )
     if args['layout'] == None: raise Exception("The layout " + options.layout + " cannot be found")
 
     # Choose a Pacman agent
@@ -662,6 +767,9 @@ def runGames( layout, pacman, ghosts, display, numGames, record, numTraining = 0
         print('Scores:       ', ', '.join([str(score) for score in scores]))
         print('Win Rate:      %d/%d (%.2f)' % (wins.count(True), len(wins), winRate))
         print('Record:       ', ', '.join([ ['Loss', 'Win'][int(w)] for w in wins]))
+        if GameState.exploredTracking != None:
+            print('Successors:    %d generated, %d states sampled' %
+                  (GameState.exploredCount, len(GameState.explored)))
 
     return games
 
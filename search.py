@@ -17,8 +17,10 @@ In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import time
 import util
 from game import Directions
+from game import Actions
 
 
 class SearchProblem:
@@ -63,6 +65,25 @@ class SearchProblem:
         """
         util.raiseNotDefined()
 
+    def getGoalStates(self):
+        """
+        Returns a list of all goal states, or None if they cannot be listed.
+
+        Optional: only bidirectionalSearch uses it (together with
+        getPredecessors) and it falls back to uniformCostSearch otherwise.
+        """
+        return None
+
+    def getPredecessors(self, state):
+        """
+          state: Search state
+
+        Optional counterpart of getSuccessors: returns a list of triples,
+        (predecessor, action, stepCost), where 'action' is the action that
+        leads from 'predecessor' to state and 'stepCost' is its cost.
+        """
+        util.raiseNotDefined()
+
 
 def tinyMazeSearch(problem):
     """
@@ -74,6 +95,97 @@ def tinyMazeSearch(problem):
     return [s, s, w, s, w, w, s, w]
 
 
+class SearchNodes:
+    """
+    A node store shared by the graph searches below.
+
+    Every generated node only remembers the index of its parent node and the
+    action that leads from the parent to it.  Instead of copying the path for
+    every successor, the list of actions is rebuilt once by following the
+    parent pointers back to the root (usually when the goal is found).
+    """
+    ROOT = -1
+
+    def __init__(self):
+        self.parents = []
+        self.actions = []
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self, parent, action):
+        "Stores a new node and returns its index"
+        self.parents.append(parent)
+        self.actions.append(action)
+        return len(self.parents) - 1
+
+    def path(self, node):
+        "Returns the list of actions that leads from the root to the node"
+        path = []
+        while self.parents[node] != SearchNodes.ROOT:
+            path.append(self.actions[node])
+            node = self.parents[node]
+        path.reverse()
+        return path
+
+
+class StateTable:
+    """
+    A dictionary for search states.  States that cannot be hashed because
+    they contain lists or sets are stored
+    under a frozen copy made of tuples and frozensets.  Anything that cannot
+    be frozen is kept in a list of (state, value) pairs and found by
+    comparison.
+    """
+
+    def __init__(self):
+        self.hashed = {}
+        self.unhashable = []
+
+    def __len__(self):
+        return len(self.hashed) + len(self.unhashable)
+
+    def __contains__(self, state):
+        return self.get(state, self) is not self
+
+    def get(self, state, default=None):
+        try:
+            return self.hashed.get(state, default)
+        except TypeError:
+            pass
+        try:
+            return self.hashed.get(_freezeState(state), default)
+        except TypeError:
+            for otherState, value in self.unhashable:
+                if otherState == state:
+                    return value
+            return default
+
+    def __setitem__(self, state, value):
+        try:
+            self.hashed[state] = value
+            return
+        except TypeError:
+            pass
+        try:
+            self.hashed[_freezeState(state)] = value
+        except TypeError:
+            for index, (otherState, _) in enumerate(self.unhashable):
+                if otherState == state:
+                    self.unhashable[index] = (state, value)
+                    return
+            self.unhashable.append((state, value))
+
+
+def _freezeState(state):
+    "Returns a hashable copy of a state made of (nested) tuples, lists and sets"
+    if isinstance(state, (tuple, list)):
+        return tuple([_freezeState(part) for part in state])
+    if isinstance(state, (set, frozenset)):
+        return frozenset(state)
+    return state
+
+
 def depthFirstSearch(problem: SearchProblem):
     """
     Search the deepest nodes in the search tree first.
@@ -95,41 +207,32 @@ def depthFirstSearch(problem: SearchProblem):
     """
     fringe = util.Stack()  # the frontier
     explored = set()  # the already explored nodes
-    parent = dict()  # will remember the parent of every explored node
+    nodes = SearchNodes()  # will remember the parent of every generated node
 
     # init setup
-    initState = (problem.getStartState(), (), ())
-    fringe.push(initState)  # the starting state as a tupel
+    # (coordinates, node)
+    fringe.push((problem.getStartState(), nodes.add(SearchNodes.ROOT, None)))
 
     while not fringe.isEmpty():
         # get the first element from the fringe
-        stateToExplore = fringe.pop()
+        stateToExplore, node = fringe.pop()
 
         # test if the current node is a goal node
-        if problem.isGoalState(stateToExplore[0]):
-            path = []
-            while (stateToExplore != initState):
-                # appends the direction of the state
-                path.append(stateToExplore[1])
-                # find the parent of the current state
-                stateToExplore = parent[stateToExplore]
-            path.reverse()
-            return path
+        if problem.isGoalState(stateToExplore):
+            return nodes.path(node)
 
         # only explore new nodes
-        if stateToExplore[0] not in explored:
+        if stateToExplore not in explored:
             # add the state to the explored states
-            explored.add(stateToExplore[0])
+            explored.add(stateToExplore)
 
             # explores all the successor nodes
-            for successor in problem.getSuccessors(stateToExplore[0]):
+            for (successor, direction, _) in problem.getSuccessors(stateToExplore):
                 # ignore the explored already coordinates
-                if successor[0] in explored:
+                if successor in explored:
                     continue
-                # in order to reconstruct the path we need to save the parent of each explored node
-                parent[successor] = stateToExplore
-                # successor is not only a position but a tupel (coordiantes, direction, cost)
-                fringe.push(successor)
+                # in order to reconstruct the path we save the parent of each generated node
+                fringe.push((successor, nodes.add(node, direction)))
 
     # no path exists
     return None
@@ -139,33 +242,26 @@ def breadthFirstSearch(problem: SearchProblem):
     """Search the shallowest nodes in the search tree first."""
 
     fringe = util.Queue()  # the frontier
-    # different path finding to allow use for question 5
-    # this queue keeps track of the according path for each node in the fringe
-    path_options = util.Queue()
-    explored = []  # the already explored nodes; has to be a list, so it is hashable
-    # parent = dict() #will remember the parent of every explored node
+    explored = StateTable()  # the already explored nodes; also works for unhashable states
+    nodes = SearchNodes()  # will remember the parent of every generated node
 
     # init setup
-    # initState = (problem.getStartState(),(),()) #coordinates, direction, cost
-    fringe.push(problem.getStartState())  # the starting state as a tupel
-    path_options.push([])
-    explored.append(problem.getStartState())  # we only 'explore'
+    # (coordinates, node)
+    fringe.push((problem.getStartState(), nodes.add(SearchNodes.ROOT, None)))
+    explored[problem.getStartState()] = True  # we only 'explore'
 
     while not fringe.isEmpty():
         # get the first node from the fringe
-        stateToExplore = fringe.pop()
-        current_path = path_options.pop()
+        stateToExplore, node = fringe.pop()
 
         # test if the state to explore is a goal state
         if problem.isGoalState(stateToExplore):
-            return current_path
+            return nodes.path(node)
 
         for (successor, direction, _) in problem.getSuccessors(stateToExplore):
             if successor not in explored:
-                fringe.push(successor)
-                explored.append(successor)
-                new_path_up_to_now = current_path + [direction]
-                path_options.push(new_path_up_to_now)
+                fringe.push((successor, nodes.add(node, direction)))
+                explored[successor] = True
 
     # no path exists
     return []
@@ -173,23 +269,21 @@ def breadthFirstSearch(problem: SearchProblem):
 
 def uniformCostSearch(problem: SearchProblem):
     """Search the node of least total cost first."""
-    # TODO use update or push?
 
-    fringe = util.PriorityQueue()  # the frontier
+    fringe = util.BucketQueue()  # the frontier; becomes a heap if a cost is not integral
     explored = set()  # the coordinates of the already expored nodes
+    nodes = SearchNodes()  # will remember the parent of every generated node
 
     # init setup
-    # (coordinates, direction, path)
-    initState = (problem.getStartState(), (), list())
-    fringe.push(initState, 0)  # the starting state (item,cost)
+    # (coordinates, cost, node)
+    fringe.push((problem.getStartState(), 0, nodes.add(SearchNodes.ROOT, None)), 0)
 
     while not fringe.isEmpty():
         # get the first node from the fringe
-        # coodinate, ((direction),(cost)), pathArrayOfDirections
-        CooridnatesToExplore, *_, path = fringe.pop()
+        CooridnatesToExplore, cost, node = fringe.pop()
         # test if the state to explore is a goal state
         if problem.isGoalState(CooridnatesToExplore):
-            return path
+            return nodes.path(node)
 
         # only explore new nodes
         if CooridnatesToExplore not in explored:
@@ -197,20 +291,97 @@ def uniformCostSearch(problem: SearchProblem):
             explored.add(CooridnatesToExplore)
 
             # explore the current node
-            for successor in problem.getSuccessors(CooridnatesToExplore):
+            for (successor, direction, succ_cost) in problem.getSuccessors(CooridnatesToExplore):
                 # skip already explored coordinates
-                if successor[0] in explored:
+                if successor in explored:
                     continue
-                # update the path
-                newPath = path + [successor[1]]
+                # the cost of the path is carried along instead of replaying it with getCostOfActions
+                summed_cost = cost + succ_cost
                 # add new nodes to the fringe
-                fringe.update(item=(*successor, newPath),
-                              priority=problem.getCostOfActions(newPath))
+                fringe.push((successor, summed_cost, nodes.add(node, direction)),
+                            summed_cost)
 
     # no path exists
     return None
 
 
+def _implements(problem, method):
+    "Whether problem has method, other than the placeholder of SearchProblem that raises"
+    if not hasattr(problem, method):
+        return False
+    return getattr(type(problem), method, None) is not getattr(SearchProblem, method, None)
+
+
+def bidirectionalSearch(problem: SearchProblem):
+    """
+    Search forwards from the start and backwards from the goals at the same
+    time, always continuing on the side with the cheaper frontier, and stop
+    as soon as no path can be cheaper than the best one found where the two
+    searches met.
+
+    Needs problem.getGoalStates and problem.getPredecessors; problems that do
+    not implement them are solved by uniformCostSearch instead.
+    """
+    goals = problem.getGoalStates() if hasattr(problem, 'getGoalStates') else None
+    if not goals or not _implements(problem, 'getPredecessors'):
+        return uniformCostSearch(problem)
+
+    start = problem.getStartState()
+    if problem.isGoalState(start):
+        return []
+
+    # everything below exists once per direction: index 0 searches forwards
+    # from the start, index 1 backwards from the goals
+    FORWARD, BACKWARD = 0, 1
+    expand = (problem.getSuccessors, problem.getPredecessors)
+    fringes = (util.PriorityQueue(), util.PriorityQueue())  # the frontiers
+    nodes = (SearchNodes(), SearchNodes())  # the parents of the generated nodes
+    best = ({}, {})  # state -> (cost, node) of the cheapest path found so far
+    explored = (set(), set())  # the already explored states
+    lastCost = [0, 0]  # the cost of the last explored state on each side
+
+    for side, roots in ((FORWARD, [start]), (BACKWARD, goals)):
+        for root in roots:
+            node = nodes[side].add(SearchNodes.ROOT, None)
+            best[side][root] = (0, node)
+            fringes[side].push((root, 0, node), 0)
+
+    meetingCost, meetingState = float('inf'), None
+    while not fringes[FORWARD].isEmpty() and not fringes[BACKWARD].isEmpty():
+        side = FORWARD if lastCost[FORWARD] <= lastCost[BACKWARD] else BACKWARD
+        stateToExplore, cost, node = fringes[side].pop()
+        if stateToExplore in explored[side]:
+            continue
+        lastCost[side] = cost
+        # every path through an unexplored state costs at least this much
+        if lastCost[FORWARD] + lastCost[BACKWARD] >= meetingCost:
+            break
+        explored[side].add(stateToExplore)
+
+        other = best[1 - side]
+        for (neighbor, direction, stepCost) in expand[side](stateToExplore):
+            if neighbor in explored[side]:
+                continue
+            summed_cost = cost + stepCost
+            if neighbor in best[side] and best[side][neighbor][0] <= summed_cost:
+                continue
+            child = nodes[side].add(node, direction)
+            best[side][neighbor] = (summed_cost, child)
+            fringes[side].push((neighbor, summed_cost, child), summed_cost)
+            # the two searches meet in neighbor
+            if neighbor in other and summed_cost + other[neighbor][0] < meetingCost:
+                meetingCost, meetingState = summed_cost + other[neighbor][0], neighbor
+
+    # no path exists
+    if meetingState == None:
+        return None
+
+    # the backward actions lead from the meeting state towards the goal
+    path = nodes[FORWARD].path(best[FORWARD][meetingState][1])
+    path += reversed(nodes[BACKWARD].path(best[BACKWARD][meetingState][1]))
+    return path
+
+
 def nullHeuristic(state, problem=None):
     """
     A heuristic function estimates the cost from the current state to the nearest
@@ -222,74 +393,641 @@ def nullHeuristic(state, problem=None):
 def aStarSearch(problem: SearchProblem, heuristic=nullHeuristic):
     """Search the node that has the lowest combined cost and heuristic first."""
 
-    # OLD VERSION
+    fringe = util.BucketQueue()  # the frontier; becomes a heap if a cost or heuristic is not integral
+    explored = StateTable()  # the already explored states
+    bestCost = StateTable()  # state -> the lowest cost it was pushed with
+    nodes = SearchNodes()  # will remember the parent of every generated node
+    statistics = problem._searchStatistics = {'duplicatesPruned': 0, 'stalePopsSkipped': 0}
 
-    # TODO how to treat different heuristics?
+    # init setup
+    # (coordinates, cost, node)
+    startState = problem.getStartState()
+    bestCost[startState] = 0
+    fringe.push((startState, 0, nodes.add(SearchNodes.ROOT, None)), 0)
 
-    # fringe = util.PriorityQueue() #the frontier
-    # explored = set() #the coordinates of the already expored nodes
+    while not fringe.isEmpty():
+        # get the first node from the fringe
+        stateToExplore, cost, node = fringe.pop()
 
-    # #init setup
-    # initState = (problem.getStartState(),(),list()) #(coordinates, direction, path)
-    # fringe.push(initState,heuristic(initState[0],problem)) #the starting state (item,cost)
+        # a cheaper entry of the same state was popped before
+        if stateToExplore in explored:
+            statistics['stalePopsSkipped'] += 1
+            continue
+
+        if problem.isGoalState(stateToExplore):
+            statistics['peakFringe'] = fringe.maxSize
+            return nodes.path(node)
+
+        explored[stateToExplore] = True
+        for (successor, direction, succ_cost) in problem.getSuccessors(stateToExplore):
+            summed_cost = cost + succ_cost
+            # an entry that is not cheaper than one already pushed would only
+            # be popped after it (and skipped), so it is not pushed at all
+            if bestCost.get(successor, float('inf')) <= summed_cost:
+                statistics['duplicatesPruned'] += 1
+                continue
+            bestCost[successor] = summed_cost
+            fringe.push((successor, summed_cost, nodes.add(node, direction)),
+                        summed_cost + heuristic(successor, problem))
+
+    statistics['peakFringe'] = fringe.maxSize
+    return []
 
-    # while not fringe.isEmpty():
-    #     #get the first node from the fringe
-    #     CooridnatesToExplore, *other, path=fringe.pop() #coodinate, ((direction),(cost)), pathArrayOfDirections
-    #     #test if the state to explore is a goal state
-    #     if problem.isGoalState(CooridnatesToExplore):
-    #         return path
 
-    #     #only explore new nodes
-    #     if CooridnatesToExplore not in explored:
-    #         #mark the current node as already explored
-    #         explored.add(CooridnatesToExplore)
+def weightedAStarSearch(problem: SearchProblem, heuristic=nullHeuristic, weight=2.0):
+    """
+    A* that inflates the heuristic by weight (f = g + weight * h).  It
+    usually expands far fewer nodes than aStarSearch and, with an admissible
+    heuristic, returns a path that costs at most weight times the optimum.
 
-    #         #explore the current node
-    #         for successor in problem.getSuccessors(CooridnatesToExplore):
-    #             #skip already explored coordinates
-    #             if successor[0] in explored:
-    #                 continue
-    #             #update the path
-    #             newPath = path + [successor[1]]
-    #             #add new nodes to the fringe
-    #             fringe.update(item=(*successor,newPath),priority=problem.getCostOfActions(newPath)+heuristic(successor[0],problem))
+    The suboptimality bound that was proven (often tighter than weight),
+    the cost of the path and the number of expanded nodes are stored in
+    problem._searchStatistics.
+    """
+    return _anytimeAStarSearch(problem, heuristic, weight, 0, None)
+
+
+def anytimeRepairingAStarSearch(problem: SearchProblem, heuristic=nullHeuristic,
+                                weight=3.0, decrement=0.5, timeLimit=10.0):
+    """
+    Anytime Repairing A* (ARA*): quickly finds a path with weighted A*, then
+    lowers the weight by decrement and repairs the path, reusing the work of
+    the previous iterations, until the path is proven optimal or timeLimit
+    seconds have passed.  The search always runs until it has found a first
+    path, even if that takes longer than timeLimit.
+
+    Returns the best path found.  The suboptimality bound proven for it, its
+    cost, the last weight, the number of iterations and the number of
+    expanded nodes are stored in problem._searchStatistics.
+    """
+    return _anytimeAStarSearch(problem, heuristic, weight, decrement, timeLimit)
 
-    # #no path exists
-    # return []
 
-    # NEW VERSION (uses the same path finding as in BFS)
+def _anytimeAStarSearch(problem, heuristic, weight, decrement, timeLimit):
+    """
+    The ARA* search behind weightedAStarSearch (one iteration with a fixed
+    weight) and anytimeRepairingAStarSearch.  States must be hashable.
+
+    Every iteration expands states in order of g + weight * h until no state
+    on the fringe promises a cheaper goal.  States whose cost improves after
+    they were expanded in the current iteration are not expanded again but
+    remembered as inconsistent and put back on the fringe for the next one.
+    """
+    deadline = None if timeLimit == None else time.time() + float(timeLimit)
+    weight, decrement = float(weight), float(decrement)
+
+    nodes = SearchNodes()  # will remember the parent of every generated node
+    costs = {}  # state -> the cheapest cost found so far
+    nodeOf = {}  # state -> the node of the cheapest path found so far
+    heuristics = {}  # state -> heuristic value, heuristics can be expensive
+
+    def h(state):
+        if state not in heuristics:
+            heuristics[state] = heuristic(state, problem)
+        return heuristics[state]
+
+    def key(state):
+        return costs[state] + weight * h(state)
+
+    start = problem.getStartState()
+    costs[start] = 0
+    nodeOf[start] = nodes.add(SearchNodes.ROOT, None)
+
+    fringe = util.PriorityQueue()  # the frontier of the current iteration
+    fringe.update(start, key(start))
+    onFringe = {start}  # the states on the fringe
+    inconsistent = set()  # improved states that were already expanded in this iteration
+    goalCost, goalNode = float('inf'), None
+
+    statistics = {'iterations': 0, 'expanded': 0, 'weight': weight,
+                  'cost': goalCost, 'bound': float('inf')}
+    problem._searchStatistics = statistics
+
+    while True:
+        statistics['iterations'] += 1
+        statistics['weight'] = weight
+        explored = set()  # the states expanded in this iteration
+        timedOut = False
+
+        while not fringe.isEmpty():
+            stateToExplore = fringe.pop()
+            # stop as soon as no state on the fringe promises a cheaper goal,
+            # or when time is up and there is a path to return
+            timedOut = goalNode != None and deadline != None and time.time() > deadline
+            if key(stateToExplore) >= goalCost or timedOut:
+                fringe.update(stateToExplore, key(stateToExplore))
+                break
+            onFringe.discard(stateToExplore)
+
+            if problem.isGoalState(stateToExplore):
+                if costs[stateToExplore] < goalCost:
+                    goalCost, goalNode = costs[stateToExplore], nodeOf[stateToExplore]
+                continue
+
+            explored.add(stateToExplore)
+            statistics['expanded'] += 1
+            for (successor, direction, succ_cost) in problem.getSuccessors(stateToExplore):
+                summed_cost = costs[stateToExplore] + succ_cost
+                if successor in costs and costs[successor] <= summed_cost:
+                    continue
+                costs[successor] = summed_cost
+                nodeOf[successor] = nodes.add(nodeOf[stateToExplore], direction)
+                if successor in explored:
+                    inconsistent.add(successor)
+                else:
+                    fringe.update(successor, key(successor))
+                    onFringe.add(successor)
+
+        # no path exists
+        if goalNode == None:
+            return None
+
+        # the optimal cost is at least the smallest unweighted f-value left
+        lowerBound = min([costs[s] + h(s) for s in onFringe | inconsistent] + [goalCost])
+        if goalCost <= lowerBound:
+            bound = 1.0
+        else:
+            bound = min(weight, goalCost / lowerBound) if lowerBound > 0 else weight
+        statistics['cost'], statistics['bound'] = goalCost, bound
+
+        if bound <= 1 or decrement <= 0 or timedOut or (deadline != None and time.time() > deadline):
+            return nodes.path(goalNode)
+
+        # tighten the weight and reorder the fringe and the inconsistent states for the next iteration
+        weight = max(1.0, weight - decrement)
+        fringe = util.PriorityQueue()
+        for state in onFringe | inconsistent:
+            fringe.update(state, key(state))
+        onFringe |= inconsistent
+        inconsistent = set()
+
+
+def idaStarSearch(problem: SearchProblem, heuristic=nullHeuristic, transpositionTable=False):
+    """
+    Iterative-deepening A*: repeated depth first searches that cut off every
+    node whose cost plus heuristic exceeds a bound.  The first bound is the
+    heuristic value of the start state, every following one the smallest value
+    that was cut off in the previous iteration.  Only the current path is kept
+    in memory, so memory is linear in the depth of the solution.  With an
+    admissible heuristic the returned path is optimal.
+
+    States already on the current path are skipped.  If transpositionTable is
+    set, the cheapest cost every state was reached with in the current
+    iteration is remembered as well and more expensive (or equally expensive)
+    duplicates are pruned, which trades memory for time on graphs with many
+    paths to the same state.
+
+    The number of iterations, expanded, generated and pruned nodes and the
+    final bound are stored in problem._searchStatistics.
+    """
+    start = problem.getStartState()
+    bound = heuristic(start, problem)
+    statistics = {'iterations': 0, 'expanded': 0, 'generated': 0, 'pruned': 0, 'bound': bound}
+    problem._searchStatistics = statistics
+
+    if problem.isGoalState(start):
+        return []
+
+    while bound < float('inf'):
+        statistics['iterations'] += 1
+        statistics['bound'] = bound
+        nextBound = float('inf')  # the smallest f-value cut off in this iteration
+        table = {}  # state -> the cheapest cost it was reached with in this iteration
+
+        path = []  # the actions leading to the state on top of the stack
+        onPath = {start}  # the states on the current path
+        # every frame holds (state, cost, iterator over the remaining successors)
+        frames = [(start, 0, iter(problem.getSuccessors(start)))]
+        statistics['expanded'] += 1
+
+        while frames:
+            stateToExplore, cost, successors = frames[-1]
+            for (successor, direction, succ_cost) in successors:
+                statistics['generated'] += 1
+                if successor in onPath:
+                    continue
+                summed_cost = cost + succ_cost
+                if transpositionTable:
+                    if table.get(successor, float('inf')) <= summed_cost:
+                        statistics['pruned'] += 1
+                        continue
+                    table[successor] = summed_cost
+                f = summed_cost + heuristic(successor, problem)
+                if f > bound:
+                    nextBound = min(nextBound, f)
+                    continue
+
+                path.append(direction)
+                if problem.isGoalState(successor):
+                    return path
+                # descend into the successor, the rest of this frame waits on the stack
+                onPath.add(successor)
+                frames.append((successor, summed_cost, iter(problem.getSuccessors(successor))))
+                statistics['expanded'] += 1
+                break
+            else:
+                # all successors are done, backtrack
+                frames.pop()
+                onPath.discard(stateToExplore)
+                if frames:
+                    path.pop()
+
+        bound = nextBound
+
+    # no path exists
+    return None
+
+
+def jumpPointSearch(problem: SearchProblem):
+    """
+    Jump Point Search for grid problems with unit step costs and four
+    movement directions, like PositionSearchProblem with its default costFn.
+
+    Instead of expanding every cell, A* (with the Manhattan distance to the
+    nearest goal) only expands jump points: straight moves are followed
+    until a cell is reached where an optimal path may have to turn.  Moving
+    horizontally that is a cell with a free vertical neighbour whose cell
+    behind is a wall; moving vertically a cell from which a horizontal scan
+    finds a jump point.  The straight segments are expanded back into
+    ordinary Directions, so the result works with SearchAgent.
+
+    Needs problem.walls, problem.getGoalStates and a costFn that is 1 on all
+    free cells; other problems are solved by uniformCostSearch instead.  The
+    number of expanded and generated jump points is stored in
+    problem._searchStatistics.
+    """
+    walls = getattr(problem, 'walls', None)
+    goals = problem.getGoalStates() if hasattr(problem, 'getGoalStates') else None
+    if walls == None or not goals or not _hasUnitCosts(problem, walls):
+        return uniformCostSearch(problem)
+    goals = set(goals)
+
+    def isFree(x, y):
+        return 0 <= x < walls.width and 0 <= y < walls.height and not walls[x][y]
+
+    def jump(x, y, dx, dy):
+        "Returns the first jump point after (x, y) in direction (dx, dy) or None"
+        while True:
+            x, y = x + dx, y + dy
+            if not isFree(x, y):
+                return None
+            if (x, y) in goals:
+                return (x, y)
+            if dx != 0:
+                # a forced neighbour above or below
+                if (isFree(x, y + 1) and not isFree(x - dx, y + 1)) or \
+                        (isFree(x, y - 1) and not isFree(x - dx, y - 1)):
+                    return (x, y)
+            elif jump(x, y, 1, 0) != None or jump(x, y, -1, 0) != None:
+                return (x, y)
+
+    def directionsFrom(x, y, vector):
+        "The directions worth following from a jump point reached by moving along vector"
+        if vector == None:
+            return [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        dx, dy = vector
+        if dy != 0:
+            return [vector, (1, 0), (-1, 0)]
+        # moving horizontally only the forced neighbours need a turn
+        return [vector] + [(0, side) for side in (1, -1)
+                           if isFree(x, y + side) and not isFree(x - dx, y + side)]
+
+    def distanceToGoal(position):
+        return min(util.manhattanDistance(position, goal) for goal in goals)
+
+    statistics = {'expanded': 0, 'generated': 0}
+    problem._searchStatistics = statistics
 
     fringe = util.PriorityQueue()  # the frontier
-    # this queue keeps track of the according path for each node in the fringe
-    path_options = util.PriorityQueue()
-    explored = []  # the already explored nodes; has to be a list, so it is hashable
+    best = {}  # jump point -> the cheapest cost it was reached with
+    nodes = SearchNodes()  # the actions are (vector, number of steps) segments
 
     # init setup
-    # (coordinates, cost), pathArrayOfDirections
-    fringe.push((problem.getStartState(), 0), 0)
-    path_options.push([], 0)
+    # (coordinates, cost, node, vector of the last move)
+    start = problem.getStartState()
+    best[start] = 0
+    fringe.push((start, 0, nodes.add(SearchNodes.ROOT, None), None), distanceToGoal(start))
 
     while not fringe.isEmpty():
-        # get the first node from the fringe
-        stateToExplore, cost = fringe.pop()
-        current_path = path_options.pop()
+        stateToExplore, cost, node, vector = fringe.pop()
+        if best[stateToExplore] < cost:
+            continue  # a cheaper way to this jump point was found later
 
         if problem.isGoalState(stateToExplore):
-            return current_path
+            path = []
+            for (dx, dy), steps in nodes.path(node):
+                path += [Actions.vectorToDirection((dx, dy))] * steps
+            return path
 
-        if stateToExplore not in explored:
-            explored.append(stateToExplore)
+        statistics['expanded'] += 1
+        if hasattr(problem, '_visitedlist'):
+            problem._visitedlist.append(stateToExplore)  # for display purposes
+
+        x, y = stateToExplore
+        for dx, dy in directionsFrom(x, y, vector):
+            jumpPoint = jump(x, y, dx, dy)
+            if jumpPoint == None:
+                continue
+            statistics['generated'] += 1
+            steps = abs(jumpPoint[0] - x) + abs(jumpPoint[1] - y)
+            summed_cost = cost + steps
+            if jumpPoint in best and best[jumpPoint] <= summed_cost:
+                continue
+            best[jumpPoint] = summed_cost
+            child = nodes.add(node, ((dx, dy), steps))
+            fringe.push((jumpPoint, summed_cost, child, (dx, dy)),
+                        summed_cost + distanceToGoal(jumpPoint))
 
-            for (successor, direction, succ_cost) in problem.getSuccessors(stateToExplore):
-                new_path_up_to_now = current_path + [direction]
-                summed_cost = cost + succ_cost
-                fringe.push((successor, summed_cost),
-                            summed_cost + heuristic(successor, problem))
-                path_options.push(new_path_up_to_now,
-                                  summed_cost + heuristic(successor, problem))
+    # no path exists
+    return None
 
-    return []
+
+def _hasUnitCosts(problem, walls):
+    "Whether problem.costFn is known to be 1 on every free cell of walls"
+    costFn = getattr(problem, 'costFn', None)
+    if costFn == None:
+        return False
+    return all(costFn(cell) == 1 for cell in walls.asList(False))
+
+
+class JunctionGraph:
+    """
+    The corridors of a walls grid collapsed into edges.  Junctions are the
+    free cells that do not have exactly two free neighbours (crossings, dead
+    ends, open areas); every other free cell lies in a corridor between two
+    of them.  edges maps a junction to one (endCell, actions, cells) edge
+    per move out of it, where actions and cells are the moves and cells
+    along the corridor up to and including endCell, the next junction.
+    corridorOf maps every corridor cell to the number of its corridor.
+
+    Use getJunctionGraph(walls) to share one graph between the problems of a
+    layout.  statistics has the number of cells, junctions and corridors and
+    the time it took to build the graph.
+    """
+    VECTORS = ((0, 1), (0, -1), (1, 0), (-1, 0))  # in the order NORTH, SOUTH, EAST, WEST
+
+    def __init__(self, walls):
+        startTime = time.perf_counter()
+        self.walls = walls
+        self.moves = {}  # free cell -> (nextCell, action) pairs
+        for x, y in walls.asList(False):
+            self.moves[(x, y)] = tuple([((x + dx, y + dy), Actions.vectorToDirection((dx, dy)))
+                                        for dx, dy in self.VECTORS
+                                        if 0 <= x + dx < walls.width and 0 <= y + dy < walls.height
+                                        and not walls[x + dx][y + dy]])
+        self.junctions = set([cell for cell, moves in self.moves.items() if len(moves) != 2])
+        self.corridorOf = {}
+        self.edges = {}
+        corridors = 0
+        for junction in self.junctions:
+            edges = []
+            for nextCell, action in self.moves[junction]:
+                edge = self.walk(junction, nextCell, action, self.junctions)
+                if nextCell not in self.junctions and nextCell not in self.corridorOf:
+                    # a new corridor, the walk from its other end finds it numbered
+                    for cell in edge[2][:-1]:
+                        self.corridorOf[cell] = corridors
+                    corridors += 1
+                edges.append(edge)
+            self.edges[junction] = tuple(edges)
+        self.statistics = {'cells': len(self.moves), 'junctions': len(self.junctions), 'corridors': corridors,
+                           'buildSeconds': time.perf_counter() - startTime}
+
+    def walk(self, origin, nextCell, action, stops):
+        """
+        Follows the corridor entered by moving from origin to nextCell with
+        action until a cell in stops or back at origin, and returns the edge
+        (endCell, actions, cells).
+        """
+        previous, cell = origin, nextCell
+        actions, cells = [action], [cell]
+        while cell not in stops and cell != origin:
+            for following, action in self.moves[cell]:
+                if following != previous:
+                    break
+            previous, cell = cell, following
+            actions.append(action)
+            cells.append(cell)
+        return (cell, tuple(actions), tuple(cells))
+
+JUNCTION_GRAPHS = {}  # id(walls) -> (walls, its JunctionGraph), see util.cachedForWalls
+
+def getJunctionGraph(walls):
+    "Returns the JunctionGraph of a walls grid, shared by everyone who asks for it"
+    return util.cachedForWalls(JUNCTION_GRAPHS, walls, JunctionGraph)
+
+
+def corridorSearch(problem: SearchProblem, heuristic=nullHeuristic):
+    """
+    A* on the JunctionGraph of a grid problem: instead of expanding the
+    cells of a corridor one by one, a whole corridor is one edge from a
+    junction to the next, whose cost is the sum of costFn over its cells.
+    The start and the goals become junctions of their own, so the search
+    stops in the middle of a corridor where it has to.  The corridors are
+    expanded back into ordinary Directions, so the result works with
+    SearchAgent.  The result is optimal: a cheapest path only turns at
+    junctions, and a consistent heuristic stays consistent along an edge.
+
+    Needs problem.walls, problem.getGoalStates and problem.costFn (a
+    function of the position, like the one of PositionSearchProblem); other
+    problems are solved by aStarSearch instead.  The number of expanded
+    and generated junctions and of the corridor cells that were skipped is
+    stored in problem._searchStatistics.
+    """
+    walls = getattr(problem, 'walls', None)
+    costFn = getattr(problem, 'costFn', None)
+    goals = problem.getGoalStates() if hasattr(problem, 'getGoalStates') else None
+    if walls == None or costFn == None or not goals:
+        return aStarSearch(problem, heuristic)
+    graph = getJunctionGraph(walls)
+    start = problem.getStartState()
+    stops = set(goals)
+    stops.add(start)
+    # corridors with the start or a goal inside are walked, the others are looked up
+    cutCorridors = set([graph.corridorOf[cell] for cell in stops if cell in graph.corridorOf])
+    stops |= graph.junctions
+    unitCosts = _hasUnitCosts(problem, walls)
+
+    def edgesFrom(cell):
+        if cell not in graph.junctions:
+            # the start, or a goal in a corridor
+            return [graph.walk(cell, nextCell, action, stops)
+                    for nextCell, action in graph.moves[cell]]
+        edges = []
+        for edge in graph.edges[cell]:
+            firstCell = edge[2][0]
+            if graph.corridorOf.get(firstCell) in cutCorridors:
+                edge = graph.walk(cell, firstCell, edge[1][0], stops)
+            edges.append(edge)
+        return edges
+
+    statistics = {'expanded': 0, 'generated': 0, 'cellsSkipped': 0}
+    problem._searchStatistics = statistics
+
+    fringe = util.PriorityQueue()  # the frontier
+    best = {}  # junction -> the cheapest cost it was reached with
+    nodes = SearchNodes()  # the actions are the action tuples of corridors
+
+    # init setup
+    # (coordinates, cost, node)
+    best[start] = 0
+    fringe.push((start, 0, nodes.add(SearchNodes.ROOT, None)), heuristic(start, problem))
+
+    while not fringe.isEmpty():
+        stateToExplore, cost, node = fringe.pop()
+        if best[stateToExplore] < cost:
+            continue  # a cheaper way to this junction was found later
+
+        if problem.isGoalState(stateToExplore):
+            path = []
+            for actions in nodes.path(node):
+                path += actions
+            return path
+
+        statistics['expanded'] += 1
+        if hasattr(problem, '_visitedlist'):
+            problem._visitedlist.append(stateToExplore)  # for display purposes
+
+        for endCell, actions, cells in edgesFrom(stateToExplore):
+            statistics['generated'] += 1
+            statistics['cellsSkipped'] += len(cells) - 1
+            summed_cost = cost + (len(cells) if unitCosts else sum([costFn(cell) for cell in cells]))
+            if endCell in best and best[endCell] <= summed_cost:
+                continue
+            best[endCell] = summed_cost
+            child = nodes.add(node, list(actions))
+            fringe.push((endCell, summed_cost, child), summed_cost + heuristic(endCell, problem))
+
+    # no path exists
+    return None
+
+
+class IncrementalPlanner:
+    """
+    D* Lite: plans shortest paths on a grid of walls (unit step costs, four
+    movement directions) from a moving start to the closest of a set of goal
+    cells, and repairs them instead of searching from scratch.
+
+    The planner searches backwards from the goals and keeps its g (cost to
+    the closest goal) and rhs (one step lookahead of g) tables between
+    queries.  After the start moves (moveStart), goals are added or removed
+    (addGoal, removeGoal) or cells turn into walls or back (setWall), the next
+    getPath only expands the states whose cost actually changed.
+
+    statistics counts the paths planned and the states expanded so far.
+    """
+
+    def __init__(self, walls, start, goals):
+        self.walls = walls.copy()  # setWall changes the planner's copy
+        self.start = self.lastStart = start
+        self.goals = set()
+        self.km = 0  # how far the start moved, keeps the old keys valid
+        self.g = {}  # missing entries are float('inf')
+        self.rhs = {}
+        self.fringe = util.PriorityQueue()  # the inconsistent states
+        self.statistics = {'plans': 0, 'expanded': 0}
+        for goal in goals:
+            self.addGoal(goal)
+
+    def moveStart(self, start):
+        "Plans from start from now on"
+        self.km += util.manhattanDistance(self.lastStart, start)
+        self.start = self.lastStart = start
+
+    def addGoal(self, cell):
+        self.goals.add(cell)
+        self._updateState(cell)
+
+    def removeGoal(self, cell):
+        self.goals.discard(cell)
+        self._updateState(cell)
+
+    def setWall(self, cell, isWall=True):
+        "Turns cell into a wall (or back into a free cell if isWall is False)"
+        x, y = cell
+        if self.walls[x][y] == isWall:
+            return
+        self.walls[x][y] = isWall
+        self._updateState(cell)
+        for neighbor in self._neighbors(cell):
+            self._updateState(neighbor)
+
+    def getPath(self):
+        """
+        Returns the actions of a shortest path from the start to the closest
+        goal, or None if no goal can be reached.
+        """
+        self.statistics['plans'] += 1
+        self._computeShortestPath()
+        if self._g(self.start) == float('inf'):
+            return None
+
+        path, cell = [], self.start
+        while cell not in self.goals:
+            # follow the neighbour that is closest to a goal
+            nextCell = min(self._neighbors(cell), key=self._g)
+            path.append(Actions.vectorToDirection((nextCell[0] - cell[0], nextCell[1] - cell[1])))
+            cell = nextCell
+        return path
+
+    def _g(self, cell):
+        return self.g.get(cell, float('inf'))
+
+    def _rhs(self, cell):
+        return self.rhs.get(cell, float('inf'))
+
+    def _neighbors(self, cell):
+        x, y = cell
+        neighbors = []
+        for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+            nextx, nexty = x + dx, y + dy
+            if 0 <= nextx < self.walls.width and 0 <= nexty < self.walls.height \
+                    and not self.walls[nextx][nexty]:
+                neighbors.append((nextx, nexty))
+        return neighbors
+
+    def _key(self, cell):
+        cost = min(self._g(cell), self._rhs(cell))
+        return (cost + util.manhattanDistance(self.start, cell) + self.km, cost)
+
+    def _updateState(self, cell):
+        "Recomputes rhs of cell and puts it on the fringe if it became inconsistent"
+        x, y = cell
+        if self.walls[x][y]:
+            self.rhs[cell] = float('inf')
+        elif cell in self.goals:
+            self.rhs[cell] = 0
+        else:
+            self.rhs[cell] = min([self._g(n) + 1 for n in self._neighbors(cell)] + [float('inf')])
+        if cell in self.fringe:
+            self.fringe.remove(cell)
+        if self._g(cell) != self._rhs(cell):
+            self.fringe.push(cell, self._key(cell))
+
+    def _computeShortestPath(self):
+        while not self.fringe.isEmpty():
+            oldKey, cell = self.fringe.peek()
+            if oldKey >= self._key(self.start) and self._rhs(self.start) == self._g(self.start):
+                break
+            self.fringe.pop()
+
+            newKey = self._key(cell)
+            if oldKey < newKey:
+                # the key is outdated because the start moved
+                self.fringe.push(cell, newKey)
+                continue
+            self.statistics['expanded'] += 1
+            if self._g(cell) > self._rhs(cell):
+                # overconsistent: the cell got closer to a goal
+                self.g[cell] = self.rhs[cell]
+                for neighbor in self._neighbors(cell):
+                    self._updateState(neighbor)
+            else:
+                # underconsistent: the cell got further away from the goals
+                self.g[cell] = float('inf')
+                self._updateState(cell)
+                for neighbor in self._neighbors(cell):
+                    self._updateState(neighbor)
 
 
 # Abbreviations
@@ -297,3 +1035,9 @@ bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+bds = bidirectionalSearch
+idastar = idaStarSearch
+jps = jumpPointSearch
+cs = corridorSearch
+wastar = weightedAStarSearch
+arastar = anytimeRepairingAStarSearch
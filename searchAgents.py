@@ -40,6 +40,8 @@ from game import Actions
 import util
 import time
 import search
+import array
+import collections
 from pacman import GameState
 
 
@@ -145,6 +147,113 @@ class SearchAgent(Agent):
             return Directions.STOP
 
 
+class ExtendedSearchAgent(SearchAgent):
+    """
+    A SearchAgent that also prints the statistics the newer search functions
+    (idaStarSearch, jumpPointSearch, ...) store in problem._searchStatistics,
+    e.g. > python pacman.py -p ExtendedSearchAgent -a fn=idaStarSearch
+
+    Any other agent arguments are passed on to the search function, e.g.
+    -a fn=weightedAStarSearch,prob=FoodSearchProblem,heuristic=foodHeuristic,weight=3
+    """
+
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', **searchArgs):
+        SearchAgent.__init__(self, fn, prob, heuristic)
+        if searchArgs:
+            func = getattr(search, fn)
+            for name in searchArgs:
+                if name not in func.__code__.co_varnames[:func.__code__.co_argcount]:
+                    raise AttributeError(
+                        name + ' is not an argument of ' + fn + ' in search.py.')
+            searchArgs = dict((name, parseSearchArgument(value))
+                              for name, value in searchArgs.items())
+            print('[SearchAgent] using arguments %s' % searchArgs)
+            # SearchAgent has already checked that the heuristic exists
+            if 'heuristic' not in func.__code__.co_varnames:
+                self.searchFunction = lambda x: func(x, **searchArgs)
+            else:
+                heur = globals()[heuristic] if heuristic in globals().keys() else getattr(search, heuristic)
+                self.searchFunction = lambda x: func(x, heuristic=heur, **searchArgs)
+        self.searchFunction = searchWithStatistics(self.searchFunction)
+
+
+def searchWithStatistics(searchFunction):
+    "Returns searchFunction, printing the statistics it left on the problem"
+    def searchAndPrint(problem):
+        actions = searchFunction(problem)
+        if '_searchStatistics' in dir(problem):
+            printSearchStatistics(problem._searchStatistics)
+        return actions
+    return searchAndPrint
+
+
+def parseSearchArgument(value):
+    "Converts an agent argument given on the command line to a bool or number if possible"
+    if value in ['True', 'False']:
+        return value == 'True'
+    for convert in [int, float]:
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+
+def unitCost(position):
+    "The default costFn of a PositionSearchProblem: every step costs 1"
+    return 1
+
+
+class SuccessorTable:
+    """
+    The moves between the cells of a walls grid, shared by all the
+    PositionSearchProblems on it (see getSuccessorTable).  moves holds the
+    (nextCell, action) pairs of the legal moves out of a cell and
+    predecessors the (previousCell, action) pairs of the moves into it, in
+    the order NORTH, SOUTH, EAST, WEST.  The moves of a cell are found the
+    first time they are needed.
+
+    unitSuccessors and unitPredecessors hold the finished triples of the
+    problems whose costFn is unitCost; they are filled by the problems.
+    """
+    ACTIONS = (Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST)
+
+    def __init__(self, walls):
+        self.walls = walls
+        self.moves = {}
+        self.predecessors = {}
+        self.unitSuccessors = {}
+        self.unitPredecessors = {}
+
+    def getMoves(self, cell):
+        "Returns the (nextCell, action) pairs of the legal moves out of cell"
+        moves = self.moves.get(cell)
+        if moves == None:
+            moves = self.moves[cell] = self._findMoves(cell, 1)
+        return moves
+
+    def getPredecessors(self, cell):
+        "Returns the (previousCell, action) pairs of the legal moves into cell, none if it is a wall"
+        predecessors = self.predecessors.get(cell)
+        if predecessors == None:
+            x, y = cell
+            # no move leads into a wall, so a search backwards from one ends at once
+            moves = () if self.walls[x][y] else self._findMoves(cell, -1)
+            predecessors = self.predecessors[cell] = moves
+        return predecessors
+
+    def _findMoves(self, cell, sign):
+        "The moves to (sign 1) or from (sign -1) the free cells next to cell"
+        x, y = cell
+        moves = []
+        for action in self.ACTIONS:
+            dx, dy = Actions.directionToVector(action)
+            nextx, nexty = int(x + sign * dx), int(y + sign * dy)
+            if not self.walls[nextx][nexty]:
+                moves.append(((nextx, nexty), action))
+        return tuple(moves)
+
+
 class PositionSearchProblem(search.SearchProblem):
     """
     A search problem defines the state space, start state, goal test, successor
@@ -156,12 +265,13 @@ class PositionSearchProblem(search.SearchProblem):
     Note: this search problem is fully specified; you should NOT change it.
     """
 
-    def __init__(self, gameState, costFn=lambda x: 1, goal=(1, 1), start=None, warn=True, visualize=True):
+    def __init__(self, gameState, costFn=unitCost, goal=(1, 1), start=None, warn=True, visualize=True):
         """
         Stores the start and goal.
 
         gameState: A GameState object (pacman.py)
-        costFn: A function from a search state (tuple) to a non-negative number
+        costFn: A function from a search state (tuple) to a non-negative number,
+                which must only depend on the position (its values are kept)
         goal: A position in the gameState
         """
         self.walls = gameState.getWalls()
@@ -173,10 +283,24 @@ class PositionSearchProblem(search.SearchProblem):
         self.visualize = visualize
         if warn and (gameState.getNumFood() != 1 or not gameState.hasFood(*goal)):
             print('Warning: this does not look like a regular search maze')
+        self._useSuccessorTable()
 
         # For display purposes
         self._visited, self._visitedlist, self._expanded = {}, [], 0  # DO NOT CHANGE
 
+    def _useSuccessorTable(self):
+        """
+        Looks the moves up in the SuccessorTable of the walls and keeps the
+        triples of getSuccessors and getPredecessors per cell, in the table
+        itself if every step costs 1, so problems on the same walls share them.
+        """
+        self._table = getSuccessorTable(self.walls)
+        if self.costFn is unitCost:
+            self._successors = self._table.unitSuccessors
+            self._predecessors = self._table.unitPredecessors
+        else:
+            self._successors, self._predecessors = {}, {}
+
     def getStartState(self):
         return self.startState
 
@@ -205,17 +329,15 @@ class PositionSearchProblem(search.SearchProblem):
          successor to the current state, 'action' is the action
          required to get there, and 'stepCost' is the incremental
          cost of expanding to that successor
+
+        The triples are kept per state and returned as a tuple, which the
+        caller must not change.
         """
 
-        successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x, y = state
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                cost = self.costFn(nextState)
-                successors.append((nextState, action, cost))
+        successors = self._successors.get(state)
+        if successors == None:
+            successors = self._successors[state] = tuple([(nextState, action, self.costFn(nextState))
+                                                          for nextState, action in self._table.getMoves(state)])
 
         # Bookkeeping for display purposes
         self._expanded += 1  # DO NOT CHANGE
@@ -225,6 +347,32 @@ class PositionSearchProblem(search.SearchProblem):
 
         return successors
 
+    def getGoalStates(self):
+        return [self.goal]
+
+    def getPredecessors(self, state):
+        """
+        Returns the positions from which state can be reached, the actions
+        that lead from them to state and the cost of that step, which is the
+        cost of stepping into state.  Used by search.bidirectionalSearch to
+        search backwards from the goal.  No move leads into a wall, so a wall
+        has no predecessors.
+        """
+
+        predecessors = self._predecessors.get(state)
+        if predecessors == None:
+            cost = self.costFn(state)
+            predecessors = self._predecessors[state] = tuple([(prevState, action, cost)
+                                                              for prevState, action in self._table.getPredecessors(state)])
+
+        # Bookkeeping for display purposes
+        self._expanded += 1
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -311,6 +459,9 @@ class CornersProblem(search.SearchProblem):
         for corner in self.corners:
             if not startingGameState.hasFood(*corner):
                 print('Warning: no food in corner ' + str(corner))
+        # the visited corners are the bits of an int: corner i is bit i
+        self.cornerBits = dict((corner, 1 << i) for i, corner in enumerate(self.corners))
+        self.allCorners = (1 << len(self.corners)) - 1
         self._expanded = 0  # DO NOT CHANGE; Number of search nodes expanded
         # Please add any code here which you would like to use
         # in initializing the problem
@@ -321,14 +472,15 @@ class CornersProblem(search.SearchProblem):
         Returns the start state (in your state space, not the full Pacman state
         space)
         """
-        # returns starting position and empty list. the list will keep track of visited corners
-        return (self.startingPosition, [])
+        # returns starting position and the bits of the visited corners; a corner
+        # pacman starts on is visited already
+        return (self.startingPosition, self.cornerBits.get(self.startingPosition, 0))
 
     def isGoalState(self, state):
         """
         Returns whether this search state is a goal state of the problem.
         """
-        return len(state[1]) == 4
+        return state[1] == self.allCorners
 
     def getSuccessors(self, state):
         """
@@ -342,6 +494,7 @@ class CornersProblem(search.SearchProblem):
         """
         "*** YOUR CODE HERE ***"
         x, y = state[0]  # get position of current state
+        visited = state[1]
         successors = []
         for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
             # Add a successor state to the successor list if the action is legal
@@ -349,13 +502,8 @@ class CornersProblem(search.SearchProblem):
             nextx, nexty = int(x + dx), int(y + dy)
 
             if not self.walls[nextx][nexty]:
-                # copy current corners, because lists can be weird
-                corners = state[1].copy()
-                # only add to corner set, if corner has not been visited yet
-                if (nextx, nexty) in self.corners and (nextx, nexty) not in corners:
-                    corners.append((nextx, nexty))
-                # add successor with newly visited corner status
-                nextState = ((nextx, nexty), corners)
+                # set the bit of the corner, if the next position is one
+                nextState = ((nextx, nexty), visited | self.cornerBits.get((nextx, nexty), 0))
                 successors.append((nextState, action, 1))
 
         self._expanded += 1  # DO NOT CHANGE
@@ -394,7 +542,7 @@ def cornersHeuristic(state, problem: CornersProblem):
     # These are the walls of the maze, as a Grid (game.py)
     walls = problem.walls
 
-    unfound_corners = [cor for cor in corners if cor not in state[1]]
+    unfound_corners = [cor for cor in corners if not state[1] & problem.cornerBits[cor]]
 
     # Note: this heuristic is admissible and consitent, but does not satisfy the 1200 nodes expanded test (optional)
     # this might not be optimal, but we calculate the sum of the manhattan distances to all unvisited corners divided
@@ -425,19 +573,67 @@ class AStarCornersAgent(SearchAgent):
         self.searchType = CornersProblem
 
 
+class FoodSet:
+    """
+    The food left in a FoodSearchProblem: an immutable set of positions,
+    stored as the bits of an int over the positions of the initial food.
+
+    Removing a dot (without) makes a new FoodSet in O(1), and the hash is
+    computed once, so the states of a search can be created, compared and
+    hashed cheaply.  asList and count work like the ones of a Grid.
+    """
+
+    def __init__(self, positions, bits=None, index=None):
+        self.positions = positions  # the initial food, shared by all FoodSets of a problem
+        if index == None:
+            index = dict((position, i) for i, position in enumerate(positions))
+        self.index = index  # position -> its bit
+        self.bits = (1 << len(positions)) - 1 if bits == None else bits
+        self.hash = hash(self.bits)
+
+    def without(self, position):
+        "Returns the FoodSet without the food at position"
+        i = self.index.get(position)
+        if i == None or not self.bits >> i & 1:
+            return self
+        return FoodSet(self.positions, self.bits & ~(1 << i), self.index)
+
+    def __contains__(self, position):
+        i = self.index.get(position)
+        return i != None and self.bits >> i & 1 == 1
+
+    def count(self):
+        return self.bits.bit_count()
+
+    def asList(self):
+        "The positions of the food that is left, in the order of Grid.asList"
+        bits, positions = self.bits, self.positions
+        return [positions[i] for i in range(len(positions)) if bits >> i & 1]
+
+    def __eq__(self, other):
+        return isinstance(other, FoodSet) and self.bits == other.bits and \
+            self.positions is other.positions
+
+    def __hash__(self):
+        return self.hash
+
+    def __repr__(self):
+        return 'FoodSet(%s)' % self.asList()
+
+
 class FoodSearchProblem:
     """
     A search problem associated with finding the a path that collects all of the
     food (dots) in a Pacman game.
 
-    A search state in this problem is a tuple ( pacmanPosition, foodGrid ) where
+    A search state in this problem is a tuple ( pacmanPosition, food ) where
       pacmanPosition: a tuple (x,y) of integers specifying Pacman's position
-      foodGrid:       a Grid (see game.py) of either True or False, specifying remaining food
+      food:           a FoodSet (see above) of the remaining food
     """
 
     def __init__(self, startingGameState):
         self.start = (startingGameState.getPacmanPosition(),
-                      startingGameState.getFood())
+                      FoodSet(tuple(startingGameState.getFood().asList())))
         self.walls = startingGameState.getWalls()
         self.startingGameState = startingGameState
         self._expanded = 0  # DO NOT CHANGE
@@ -458,8 +654,7 @@ class FoodSearchProblem:
             dx, dy = Actions.directionToVector(direction)
             nextx, nexty = int(x + dx), int(y + dy)
             if not self.walls[nextx][nexty]:
-                nextFood = state[1].copy()
-                nextFood[nextx][nexty] = False
+                nextFood = state[1].without((nextx, nexty))
                 successors.append((((nextx, nexty), nextFood), direction, 1))
         return successors
 
@@ -500,9 +695,9 @@ def foodHeuristic(state, problem):
     other hand, inadmissible or inconsistent heuristics may find optimal
     solutions, so be careful.
 
-    The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a Grid
-    (see game.py) of either True or False. You can call foodGrid.asList() to get
-    a list of food coordinates instead.
+    The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a FoodSet
+    (see above). You can call foodGrid.asList() to get a list of food
+    coordinates.
 
     If you want access to info like walls, capsules, etc., you can query the
     problem.  For example, problem.walls gives you a Grid of where the walls
@@ -516,30 +711,72 @@ def foodHeuristic(state, problem):
     problem.heuristicInfo['wallCount']
     """
     position, foodGrid = state
-    foodList = foodGrid.asList()
-    useManhattan = False
-
-    if useManhattan:
-        # First we attempted to use simply the Manhattan-distance to the furthest away point
-        # but this did not work effeciently enough (expands 9551 nodes)
-        distancesToAllFoods = [util.manhattanDistance(
-            position, foodLocation) for foodLocation in foodList]
-    else:
-        # instead, we compute the actual distance to the furthest away food; this is needed for the tricky maze
-        # this is still a heuristic (we think), because we only calculate the distance from the current point to
-        # the remaining food locations, not the complete path from the current position to collect all food items
-        # The heuristic is non-trivial by defintion.
-        #
-        # admissibility: this heuristic is admissible because we only return the distance to the food furthest away
-        #                from the current position. Therefore, it is always less than the actual distance to collect
-        #                all food items (except when only one food item remains, then it is the same distance)
-        #
-        # consistency: similar reasoning like the cornersHeuristic: the distance to the food furthest away can decrease
-        #              by at most 1 which is consitent with a step cost of 1
-        distancesToAllFoods = [mazeDistance(
-            position, foodLocation, problem.startingGameState) for foodLocation in foodList]
-    # return the max distance to any food or 0 if no food remains
-    return max(distancesToAllFoods) if len(distancesToAllFoods) > 0 else 0
+    if foodGrid.count() == 0:
+        return 0
+    distances = getMazeDistances(problem.walls)
+
+    # The heuristic is the maze distance to the nearest food plus the weight of a minimum spanning tree over the
+    # remaining food, with maze distances as edge weights.
+    #
+    # admissibility: any path that eats all food first walks to some food, which is at least as far as the nearest
+    #                one, and then connects all remaining food; the food in the order it is eaten forms a spanning
+    #                tree, so that part is at least as long as the minimum spanning tree
+    #
+    # consistency: a step that eats no food changes the distance to the nearest food by at most 1 and leaves the
+    #              tree alone.  a step that eats food f costs 1, the nearest food is now the one closest to f, and
+    #              adding the edge to it to the new tree spans the old food again, so the old tree is at most that
+    #              much longer: the heuristic decreases by at most 1 either way
+    #
+    # food that Pacman cannot reach makes the problem unsolvable, so any value will do: it is left out of the
+    # nearest food, and the tree becomes a forest over the parts of the maze that hold food
+    #
+    # the tree only depends on the remaining food, which many states share, so it is kept in problem.heuristicInfo
+    treeWeights = problem.heuristicInfo.setdefault('treeWeights', {})
+    treeWeight = treeWeights.get(foodGrid)
+    if treeWeight == None:
+        treeWeight = foodTreeWeight(foodGrid.asList(), distances)
+        if len(treeWeights) >= MAX_TREE_WEIGHTS:
+            # forget the oldest tree, dictionaries keep the insertion order
+            del treeWeights[next(iter(treeWeights))]
+        treeWeights[foodGrid] = treeWeight
+    # the searches start from the food, so there is at most one per dot
+    foodDistances = [distances.getDistance(food, position) for food in foodGrid.asList()]
+    nearestFood = min([distance for distance in foodDistances if distance != None] or [0])
+    return nearestFood + treeWeight
+
+MAX_TREE_WEIGHTS = 100000  # the number of spanning tree weights foodHeuristic keeps per problem
+
+def foodTreeWeight(foodList, distances):
+    """
+    Returns the weight of a minimum spanning tree over the positions in
+    foodList, whose edges weigh the maze distances (from a MazeDistances),
+    found with Prim's algorithm.  Food that cannot be reached from the rest
+    starts a tree of its own, so the result is the weight of the minimum
+    spanning forest.
+    """
+    if len(foodList) == 0:
+        return 0
+    unreachable = float('inf')
+    targets = [distances.index[food] for food in foodList[1:]]  # the food outside the tree, as cell indices
+    rows = [distances.getRow(food) for food in foodList[1:]]  # and their rows
+    first = distances.getRow(foodList[0])
+    # the distance of each to the nearest food in the tree
+    reached = [unreachable if first[target] == MazeDistances.UNREACHABLE else first[target] for target in targets]
+    weight = 0
+    while targets:
+        nearest = reached.index(min(reached))
+        if reached[nearest] != unreachable:
+            weight += reached[nearest]
+        row = rows[nearest]
+        # remove the nearest food by moving the last one into its place
+        targets[nearest], rows[nearest], reached[nearest] = targets[-1], rows[-1], reached[-1]
+        targets.pop()
+        rows.pop()
+        reached.pop()
+        for i, target in enumerate(targets):
+            if 0 <= row[target] < reached[i]:
+                reached[i] = row[target]
+    return weight
 
 
 class ClosestDotSearchAgent(SearchAgent):
@@ -580,6 +817,201 @@ class ClosestDotSearchAgent(SearchAgent):
         return search.astar(problem=problem)
 
 
+def printSearchStatistics(statistics):
+    "Prints a dictionary of search statistics on one line"
+    print('Search statistics: %s' % ', '.join(
+        '%s=%s' % item for item in statistics.items()))
+
+
+def eatFoodAlongPaths(state, findPath, eat, statistics):
+    """
+    Returns a plan that eats all food of state one dot after the other,
+    keeping track of Pacman's position and the food instead of generating
+    GameStates.  findPath(position) returns the actions from Pacman's
+    position to the next dot (None if no food can be reached) and
+    eat(position) is called for every dot Pacman reaches, including one
+    under its start.  Prints the cost and the statistics of the planner.
+    """
+    starttime = time.time()
+    position = state.getPacmanPosition()
+    food = set(state.getFood().asList())
+    if position in food:
+        food.remove(position)
+        eat(position)
+    actions = []
+    while food:
+        nextPathSegment = findPath(position)
+        if nextPathSegment == None:
+            raise Exception('Some food cannot be reached from %s' % str(position))
+        for action in nextPathSegment:
+            position = Actions.getSuccessor(position, action)
+            position = (int(position[0]), int(position[1]))
+            if position in food:
+                food.remove(position)
+                eat(position)
+        actions += nextPathSegment
+    print('Path found with cost %d in %.1f seconds' %
+          (len(actions), time.time() - starttime))
+    printSearchStatistics(statistics)
+    return actions
+
+
+class ClosestDotFieldSearchAgent(ClosestDotSearchAgent):
+    """
+    Eats all food like ClosestDotSearchAgent, but finds every path to the
+    closest dot in a single FoodDistanceField that is repaired after each
+    dot, and keeps track of Pacman's position and the food itself instead
+    of generating GameStates along the path.
+    """
+
+    def registerInitialState(self, state):
+        field = FoodDistanceField(state.getWalls(), state.getFood().asList())
+        self.actions = eatFoodAlongPaths(
+            state, field.getPathToClosestFood, field.eat, field.statistics)
+        self.actionIndex = 0
+
+
+class FoodDistanceField:
+    """
+    The maze distance from every free cell to the closest food, found by one
+    breadth first search from all the food at once.  Following the
+    distances downhill from any cell leads to its closest dot
+    (getPathToClosestFood).
+
+    When a dot is eaten (eat), only the cells whose distance depended on it
+    are searched again, starting from the cells around them that kept
+    theirs.  Cells from which no food can be reached have no distance.
+    statistics counts the cells, the repairs and the cells they repaired.
+    """
+
+    def __init__(self, walls, food):
+        self.table = getSuccessorTable(walls)
+        self.food = set(food)
+        self.distance = dict((dot, 0) for dot in food)  # cell -> distance to the closest food
+        queue = collections.deque(food)
+        while queue:
+            cell = queue.popleft()
+            distance = self.distance[cell] + 1
+            for nextCell, action in self.table.getMoves(cell):
+                if nextCell not in self.distance:
+                    self.distance[nextCell] = distance
+                    queue.append(nextCell)
+        self.statistics = {'cells': len(self.distance), 'repairs': 0, 'cellsRepaired': 0}
+
+    def getPathToClosestFood(self, position):
+        "Returns the actions from position to the closest dot, or None if no food can be reached"
+        if position not in self.distance:
+            return None
+        path = []
+        distance = self.distance[position]
+        while distance > 0:
+            # a neighbour one step closer to the food, the first in NORTH, SOUTH, EAST, WEST order
+            for nextCell, action in self.table.getMoves(position):
+                if self.distance.get(nextCell) == distance - 1:
+                    break
+            path.append(action)
+            position, distance = nextCell, distance - 1
+        return path
+
+    def eat(self, position):
+        "Removes the dot at position (if there is one) and repairs the distances"
+        if position not in self.food:
+            return
+        self.food.remove(position)
+        # the search in __init__ found the moves of every cell that has a distance
+        distance, moves = self.distance, self.table.moves
+
+        # The cells whose distance has to grow, layer by layer from the dot: a
+        # cell keeps its distance if a neighbour that keeps its own is one closer
+        invalid = set([position])
+        layer = [position]
+        while layer:
+            nextLayer = []
+            for cell in layer:
+                farther = distance[cell] + 1
+                for nextCell, action in moves[cell]:
+                    if nextCell in invalid or distance.get(nextCell) != farther:
+                        continue
+                    supported = False
+                    for neighbor, action in moves[nextCell]:
+                        if distance[neighbor] == farther - 1 and neighbor not in invalid:
+                            supported = True
+                            break
+                    if not supported:
+                        invalid.add(nextCell)
+                        nextLayer.append(nextCell)
+            layer = nextLayer
+
+        # Search the invalid cells again, from their neighbours that kept their distance
+        for cell in invalid:
+            del distance[cell]
+        fringe = util.BucketQueue()
+        tentative = {}
+        for cell in invalid:
+            for neighbor, action in moves[cell]:
+                if neighbor in distance and distance[neighbor] + 1 < tentative.get(cell, float('inf')):
+                    tentative[cell] = distance[neighbor] + 1
+            if cell in tentative:
+                fringe.push(cell, tentative[cell])
+        while not fringe.isEmpty():
+            cell = fringe.pop()
+            distance[cell] = tentative[cell]
+            for nextCell, action in moves[cell]:
+                if nextCell in invalid and nextCell not in distance and \
+                        distance[cell] + 1 < tentative.get(nextCell, float('inf')):
+                    tentative[nextCell] = distance[cell] + 1
+                    fringe.update(nextCell, tentative[nextCell])
+        self.statistics['repairs'] += 1
+        self.statistics['cellsRepaired'] += len(invalid)
+
+
+class IncrementalFoodSearchAgent(SearchAgent):
+    """
+    Eats all food like ClosestDotSearchAgent, keeping track of Pacman's
+    position and the food itself instead of generating GameStates.
+
+    By default every path to the closest dot is planned from scratch with
+    aStarSearch, which is the faster of the two on the search layouts (see
+    searchBenchmarks.py -b replan).  With -a planner=dstar a single
+    search.IncrementalPlanner (D* Lite) is repaired after each dot instead.
+    """
+
+    def __init__(self, planner='astar'):
+        if planner not in ['astar', 'dstar']:
+            raise AttributeError(
+                planner + ' is not a planner of IncrementalFoodSearchAgent (astar or dstar).')
+        self.planner = planner
+
+    def registerInitialState(self, state):
+        if self.planner == 'dstar':
+            planner = search.IncrementalPlanner(
+                state.getWalls(), state.getPacmanPosition(), state.getFood().asList())
+
+            def findPath(position):
+                planner.moveStart(position)
+                return planner.getPath()
+            self.actions = eatFoodAlongPaths(
+                state, findPath, planner.removeGoal, planner.statistics)
+        else:
+            problem = AnyFoodSearchProblem(state)
+            problem.food = problem.food.copy()  # eat changes the problem's copy
+            statistics = {'plans': 0, 'expanded': 0}
+
+            def findPath(position):
+                problem.startState, problem._expanded = position, 0
+                actions = search.aStarSearch(problem)
+                statistics['plans'] += 1
+                statistics['expanded'] += problem._expanded
+                # the food under position is already eaten, so no path means none can be reached
+                return actions or None
+
+            def eat(position):
+                x, y = position
+                problem.food[x][y] = False
+            self.actions = eatFoodAlongPaths(state, findPath, eat, statistics)
+        self.actionIndex = 0
+
+
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
     A search problem for finding a path to any food.
@@ -603,7 +1035,8 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         # Store info for the PositionSearchProblem (no need to change this)
         self.walls = gameState.getWalls()
         self.startState = gameState.getPacmanPosition()
-        self.costFn = lambda x: 1
+        self.costFn = unitCost
+        self._useSuccessorTable()
         self._visited, self._visitedlist, self._expanded = {}, [], 0  # DO NOT CHANGE
 
     def isGoalState(self, state):
@@ -617,12 +1050,104 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         # all food-tiles are goal states
         return self.food[x][y]
 
+    def getGoalStates(self):
+        return self.food.asList()
+
+
+class MazeDistances:
+    """
+    The maze distances between the free cells of a walls grid.  A breadth
+    first search from a source cell finds its distances to all cells, which
+    are kept as a row (an array indexed like cells), so every later distance
+    from or to that cell is a lookup.  The rows are computed when a distance
+    needs them, or all at once by buildAll.
+
+    Use getMazeDistances(walls) to share one MazeDistances between all the
+    problems and heuristics of a layout.  The walls must not change.
+    """
+    UNREACHABLE = -1
+
+    def __init__(self, walls):
+        self.walls = walls
+        self.cells = walls.asList(False)
+        self.index = dict((cell, i) for i, cell in enumerate(self.cells))
+        self.neighbors = []  # cell index -> indices of the free cells next to it
+        for x, y in self.cells:
+            adjacent = ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y))
+            self.neighbors.append([self.index[cell] for cell in adjacent if cell in self.index])
+        self.rows = [None] * len(self.cells)
+        self.statistics = {'cells': len(self.cells), 'rows': 0, 'lookups': 0,
+                           'buildSeconds': 0.0, 'bytes': 0}
+
+    def getDistance(self, point1, point2):
+        "Returns the maze distance between two free cells, or None if there is no path"
+        self.statistics['lookups'] += 1
+        source, target = self.index[point1], self.index[point2]
+        row = self.rows[source]
+        if row == None:
+            # distances are symmetric, the row of point2 will do as well
+            row = self.rows[target]
+            if row == None:
+                row = self._search(source)
+            else:
+                target = source
+        distance = row[target]
+        return None if distance == self.UNREACHABLE else distance
+
+    def getRow(self, point):
+        "Returns the distances from point to all cells, indexed like cells (UNREACHABLE if there is no path)"
+        source = self.index[point]
+        row = self.rows[source]
+        if row == None:
+            row = self._search(source)
+        return row
+
+    def buildAll(self):
+        "Computes the rows of all cells that do not have one yet"
+        for source in range(len(self.cells)):
+            if self.rows[source] == None:
+                self._search(source)
+
+    def _search(self, source):
+        "Computes and stores the row of the cell with index source by breadth first search"
+        startTime = time.perf_counter()
+        row = array.array('i', [self.UNREACHABLE]) * len(self.cells)
+        row[source] = 0
+        queue = collections.deque([source])
+        neighbors = self.neighbors
+        while queue:
+            cell = queue.popleft()
+            distance = row[cell] + 1
+            for neighbor in neighbors[cell]:
+                if row[neighbor] == self.UNREACHABLE:
+                    row[neighbor] = distance
+                    queue.append(neighbor)
+        self.rows[source] = row
+        self.statistics['rows'] += 1
+        self.statistics['bytes'] += row.itemsize * len(row)
+        self.statistics['buildSeconds'] += time.perf_counter() - startTime
+        return row
+
+MAZE_DISTANCES = {}  # id(walls) -> (walls, its MazeDistances), see util.cachedForWalls
+SUCCESSOR_TABLES = {}  # id(walls) -> (walls, its SuccessorTable)
+
+def getMazeDistances(walls):
+    "Returns the MazeDistances of a walls grid, shared by everyone who asks for it"
+    return util.cachedForWalls(MAZE_DISTANCES, walls, MazeDistances)
+
+def getSuccessorTable(walls):
+    "Returns the SuccessorTable of a walls grid, shared by everyone who asks for it"
+    return util.cachedForWalls(SUCCESSOR_TABLES, walls, SuccessorTable)
+
 
 def mazeDistance(point1, point2, gameState):
     """
-    Returns the maze distance between any two points, using the search functions
-    you have already built. The gameState can be any game state -- Pacman's
-    position in that state is ignored.
+    Returns the maze distance between any two points. The gameState can be any
+    game state -- Pacman's position in that state is ignored.  Returns None if
+    walls separate the points; both must be free cells.
+
+    The distances come from the MazeDistances of the layout (see
+    getMazeDistances), so only the first call for a point searches.
 
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
@@ -633,6 +1158,4 @@ def mazeDistance(point1, point2, gameState):
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(
-        gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    return getMazeDistances(walls).getDistance(point1, point2)
@@ -0,0 +1,907 @@
+# searchBenchmarks.py
+# -------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Benchmarks for the search algorithms in search.py and the problems in
+searchAgents.py.  Every benchmark reports the wall time of a run and the peak
+memory allocated while it ran (measured in a second, traced run so that
+tracing does not distort the timing).
+
+> python searchBenchmarks.py
+> python searchBenchmarks.py -l bigMaze -f bfs,ucs
+> python searchBenchmarks.py -b queues
+> python searchBenchmarks.py -b jps
+
+The benchmarks -b can run are listed in BENCHMARKS.
+"""
+
+import heapq
+import pickle
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+import game
+import layout
+import pacman
+import search
+import searchAgents
+import util
+
+# (layout, problem type, search function, heuristic); instead of a problem type
+# the name of a SearchAgent can be given to use the problems it creates
+SEARCH_BENCHMARKS = [
+    ('bigMaze', 'PositionSearchProblem', 'dfs', None),
+    ('bigMaze', 'PositionSearchProblem', 'bfs', None),
+    ('bigMaze', 'PositionSearchProblem', 'ucs', None),
+    ('bigMaze', 'PositionSearchProblem', 'astar', 'manhattanHeuristic'),
+    ('bigMaze', 'PositionSearchProblem', 'bds', None),
+    ('mediumMaze', 'PositionSearchProblem', 'astar', 'manhattanHeuristic'),
+    ('mediumMaze', 'PositionSearchProblem', 'idastar', 'manhattanHeuristic'),
+    ('openMaze', 'PositionSearchProblem', 'bfs', None),
+    ('openMaze', 'PositionSearchProblem', 'bds', None),
+    ('bigMaze', 'StayEastSearchAgent', 'ucs', None),
+    ('bigMaze', 'StayWestSearchAgent', 'ucs', None),
+    ('mediumCorners', 'CornersProblem', 'bfs', None),
+    ('mediumCorners', 'CornersProblem', 'astar', 'cornersHeuristic'),
+    ('bigCorners', 'CornersProblem', 'bfs', None),
+    ('bigCorners', 'CornersProblem', 'astar', 'cornersHeuristic'),
+    ('trickySearch', 'FoodSearchProblem', 'astar', 'foodHeuristic'),
+]
+
+
+def loadGameState(layoutName):
+    "Returns the initial GameState of a layout without any ghosts"
+    lay = layout.getLayout(layoutName)
+    if lay == None:
+        raise Exception("The layout " + layoutName + " cannot be found")
+    gameState = pacman.GameState()
+    gameState.initialize(lay, 0)
+    return gameState
+
+
+def timed(function, *args, **keyArgs):
+    "Calls function(*args, **keyArgs) once and returns the pair (result, seconds)"
+    startTime = time.perf_counter()
+    result = function(*args, **keyArgs)
+    return result, time.perf_counter() - startTime
+
+
+def microsecondsPerCall(function, repetitions):
+    "Calls function() repetitions times and returns the microseconds a call takes on average"
+    def repeat():
+        for _ in range(repetitions):
+            function()
+    _, seconds = timed(repeat)
+    return 1e6 * seconds / repetitions
+
+
+def measure(function, *args, **keyArgs):
+    """
+    Calls function(*args, **keyArgs) twice and returns the triple
+    (result, seconds, peakBytes).
+    """
+    result, seconds = timed(function, *args, **keyArgs)
+
+    tracemalloc.start()
+    try:
+        function(*args, **keyArgs)
+        _, peakBytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peakBytes
+
+
+def printReportHeader(columns):
+    """
+    Prints the titles of a report's columns, which are (title, format)
+    pairs, each title as wide as the values its format prints.
+    """
+    titles = []
+    for title, format in columns:
+        align, width, suffix = re.match(r'%(-?)(\d*)(?:\.\d+)?[a-z](.*)', format).groups()
+        width = int(width or 0) + len(suffix.replace('%%', '%'))
+        titles.append('%*s' % (-width if align else width, title))
+    print(' '.join(titles))
+
+
+def printReportRow(columns, *values):
+    "Prints one row of a report, a value for each of its (title, format) columns"
+    print(' '.join([format % value for (title, format), value in zip(columns, values)]))
+
+
+def benchmarkSearch(layoutName, problemName, fnName, heuristicName=None):
+    """
+    Runs one search on a fresh problem and returns a dictionary with the cost
+    of the solution, the nodes expanded, the time and the peak memory.
+    """
+    gameState = loadGameState(layoutName)
+    problemType = getattr(searchAgents, problemName)
+    if problemName.endswith('Agent'):
+        problemType = problemType().searchType
+    func = getattr(search, fnName)
+    if heuristicName != None:
+        heuristic = getattr(searchAgents, heuristicName, None) or getattr(search, heuristicName)
+    problems = []
+
+    def run():
+        problem = problemType(gameState)
+        problems.append(problem)
+        if heuristicName == None:
+            return func(problem)
+        return func(problem, heuristic=heuristic)
+
+    actions, seconds, peakBytes = measure(run)
+    return {'cost': problems[0].getCostOfActions(actions),
+            'expanded': problems[0]._expanded,
+            'seconds': seconds,
+            'peakKiB': peakBytes / 1024.0}
+
+
+def printSearchBenchmarks(layouts=None, functions=None):
+    """
+    Runs the SEARCH_BENCHMARKS, or those of them on one of the given layouts
+    with one of the given search functions.
+    """
+    benchmarks = SEARCH_BENCHMARKS
+    if layouts != None:
+        benchmarks = [b for b in benchmarks if b[0] in layouts]
+    if functions != None:
+        benchmarks = [b for b in benchmarks if b[2] in functions]
+    columns = [('layout', '%-14s'), ('problem', '%-22s'), ('fn', '%-8s'), ('heuristic', '%-20s'),
+               ('cost', '%12.6g'), ('expanded', '%9d'), ('seconds', '%9.3f'), ('peak KiB', '%11.1f')]
+    printReportHeader(columns)
+    for layoutName, problemName, fnName, heuristicName in benchmarks:
+        result = benchmarkSearch(layoutName, problemName, fnName, heuristicName)
+        printReportRow(columns, layoutName, problemName, fnName, heuristicName or '-', result['cost'],
+                       result['expanded'], result['seconds'], result['peakKiB'])
+
+
+class LegacyPriorityQueue:
+    """
+    The original util.PriorityQueue, whose update scans the whole heap and
+    heapifies it again.  Kept here as the baseline of the queue benchmark.
+    """
+    def  __init__(self):
+        self.heap = []
+        self.count = 0
+
+    def push(self, item, priority):
+        entry = (priority, self.count, item)
+        heapq.heappush(self.heap, entry)
+        self.count += 1
+
+    def pop(self):
+        (_, _, item) = heapq.heappop(self.heap)
+        return item
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def update(self, item, priority):
+        for index, (p, c, i) in enumerate(self.heap):
+            if i == item:
+                if p <= priority:
+                    break
+                del self.heap[index]
+                self.heap.append((priority, c, item))
+                heapq.heapify(self.heap)
+                break
+        else:
+            self.push(item, priority)
+
+
+def legacyPackBits(grid):
+    """
+    The original Grid.packBits, kept here as the baseline of the packing
+    benchmark: (width, height, bitPackedInts...) with 30 cells per int.
+    """
+    bits = [grid.width, grid.height]
+    currentInt = 0
+    for i in range(grid.height * grid.width):
+        bit = grid.CELLS_PER_INT - (i % grid.CELLS_PER_INT) - 1
+        x, y = grid._cellIndexToPosition(i)
+        if grid[x][y]:
+            currentInt += 2 ** bit
+        if (i + 1) % grid.CELLS_PER_INT == 0:
+            bits.append(currentInt)
+            currentInt = 0
+    bits.append(currentInt)
+    return tuple(bits)
+
+
+def legacyReconstituteGrid(bitRep):
+    "The original reconstituteGrid with its _unpackBits and _unpackInt"
+    width, height = bitRep[:2]
+    grid = game.Grid(width, height)
+    cell = 0
+    for packed in bitRep[2:]:
+        bools = []
+        for i in range(grid.CELLS_PER_INT):
+            n = 2 ** (grid.CELLS_PER_INT - i - 1)
+            if packed >= n:
+                bools.append(True)
+                packed -= n
+            else:
+                bools.append(False)
+        for bit in bools:
+            if cell == width * height: break
+            x, y = grid._cellIndexToPosition(cell)
+            grid[x][y] = bit
+            cell += 1
+    return grid
+
+
+def benchmarkPriorityQueue(queueClass, numItems, updatesPerItem=2, seed=188):
+    """
+    A decrease-key heavy workload like the one of uniform cost search: every
+    item is inserted through update, its priority is lowered a few times and
+    finally the queue is emptied.  Returns (seconds, popped items, queue).
+    """
+    rng = random.Random(seed)
+    priorities = [rng.randint(numItems, 4 * numItems) for _ in range(numItems)]
+    operations = list(range(numItems)) * (updatesPerItem + 1)
+    rng.shuffle(operations)
+    queue = queueClass()
+
+    def run():
+        for item in operations:
+            priorities[item] -= rng.randint(0, numItems // 2)
+            queue.update(item, priorities[item])
+        popped = []
+        while not queue.isEmpty():
+            popped.append(queue.pop())
+        return popped
+    popped, seconds = timed(run)
+    return seconds, popped, queue
+
+
+def printPriorityQueueBenchmarks(sizes=(1000, 2000, 4000)):
+    columns = [('items', '%-8d'), ('legacy s', '%12.3f'), ('indexed s', '%12.3f'),
+               ('speedup', '%8.1fx'), ('statistics', '%s')]
+    printReportHeader(columns)
+    for numItems in sizes:
+        legacySeconds, legacyPopped, _ = benchmarkPriorityQueue(LegacyPriorityQueue, numItems)
+        seconds, popped, queue = benchmarkPriorityQueue(util.PriorityQueue, numItems)
+        assert popped == legacyPopped, 'the queues disagree on the pop order'
+        printReportRow(columns, numItems, legacySeconds, seconds, legacySeconds / seconds,
+                       queue.getStatistics())
+
+
+def benchmarkSmallIntegerQueue(queueClass, numItems, maxStepCost=3, seed=188):
+    """
+    A workload like the one of uniform cost search with small integer step
+    costs: every pop pushes up to two items whose priorities are slightly
+    above the priorities popped so far.  Returns (seconds, popped items).
+    """
+    rng = random.Random(seed)
+    queue = queueClass()
+    queue.push(0, 0)
+
+    def run():
+        pushed, popped = 1, []
+        while not queue.isEmpty():
+            popped.append(queue.pop())
+            for _ in range(2):
+                if pushed < numItems:
+                    queue.push(pushed, len(popped) // 4 + rng.randint(1, maxStepCost))
+                    pushed += 1
+        return popped
+    popped, seconds = timed(run)
+    return seconds, popped
+
+
+def printBucketQueueBenchmarks(sizes=(10000, 100000, 400000)):
+    columns = [('items', '%-8d'), ('heap s', '%12.3f'), ('bucket s', '%12.3f'), ('speedup', '%8.1fx')]
+    printReportHeader(columns)
+    for numItems in sizes:
+        heapSeconds, heapPopped = benchmarkSmallIntegerQueue(util.PriorityQueue, numItems)
+        seconds, popped = benchmarkSmallIntegerQueue(util.BucketQueue, numItems)
+        assert popped == heapPopped, 'the queues disagree on the pop order'
+        printReportRow(columns, numItems, heapSeconds, seconds, heapSeconds / seconds)
+
+
+def printJumpPointBenchmarks(layouts=('mediumMaze', 'bigMaze', 'openMaze', 'openSearch', 'bigCorners')):
+    """
+    Compares jumpPointSearch with aStarSearch and manhattanHeuristic on
+    PositionSearchProblems from Pacman's position to (1, 1).
+    """
+    columns = [('layout', '%-12s'), ('cost', '%6d'), ('A* nodes', '%10d'), ('JPS nodes', '%10d'),
+               ('saved', '%7.1f%%'), ('A* s', '%10.4f'), ('JPS s', '%10.4f')]
+    printReportHeader(columns)
+    for layoutName in layouts:
+        gameState = loadGameState(layoutName)
+        aStarProblem = searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False)
+        jumpProblem = searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False)
+        aStarActions, aStarSeconds, _ = measure(search.aStarSearch, aStarProblem,
+                                                heuristic=searchAgents.manhattanHeuristic)
+        jumpActions, jumpSeconds, _ = measure(search.jumpPointSearch, jumpProblem)
+        assert jumpProblem.getCostOfActions(jumpActions) == aStarProblem.getCostOfActions(aStarActions)
+        # measure runs every search twice
+        aStarExpanded = aStarProblem._expanded // 2
+        jumpExpanded = jumpProblem._searchStatistics['expanded']
+        printReportRow(columns, layoutName, len(jumpActions), aStarExpanded, jumpExpanded,
+                       100.0 * (aStarExpanded - jumpExpanded) / aStarExpanded, aStarSeconds, jumpSeconds)
+
+
+def eatFoodFromScratch(gameState):
+    """
+    Eats all food by running aStarSearch to the closest dot from scratch after
+    every dot.  Returns (replans, cost, expanded).
+    """
+    problem = searchAgents.AnyFoodSearchProblem(gameState)
+    replans, cost, expanded = 0, 0, 0
+    while problem.food.count() > 0:
+        problem._expanded = 0
+        actions = search.aStarSearch(problem)
+        replans += 1
+        cost += len(actions)
+        expanded += problem._expanded
+        for action in actions:
+            x, y = problem.startState
+            dx, dy = game.Actions.directionToVector(action)
+            problem.startState = (int(x + dx), int(y + dy))
+            problem.food = problem.food.copy()
+            problem.food[problem.startState[0]][problem.startState[1]] = False
+    return replans, cost, expanded
+
+
+def eatFoodIncrementally(gameState):
+    """
+    Eats all food with a single search.IncrementalPlanner that is repaired
+    after every dot.  Returns (replans, cost, expanded).
+    """
+    planner = search.IncrementalPlanner(gameState.getWalls(), gameState.getPacmanPosition(),
+                                        gameState.getFood().asList())
+    position, cost = gameState.getPacmanPosition(), 0
+    while planner.goals:
+        actions = planner.getPath()
+        cost += len(actions)
+        for action in actions:
+            dx, dy = game.Actions.directionToVector(action)
+            position = (int(position[0] + dx), int(position[1] + dy))
+            planner.removeGoal(position)
+        planner.moveStart(position)
+    return planner.statistics['plans'], cost, planner.statistics['expanded']
+
+
+def eatFoodWithDistanceField(gameState):
+    """
+    Eats all food by following a searchAgents.FoodDistanceField that is
+    repaired after every dot.  Returns (repairs, cost, cells searched).
+    """
+    field = searchAgents.FoodDistanceField(gameState.getWalls(), gameState.getFood().asList())
+    position, cost = gameState.getPacmanPosition(), 0
+    while field.food:
+        actions = field.getPathToClosestFood(position)
+        cost += len(actions)
+        for action in actions:
+            dx, dy = game.Actions.directionToVector(action)
+            position = (int(position[0] + dx), int(position[1] + dy))
+        field.eat(position)
+    return field.statistics['repairs'], cost, field.statistics['cells'] + field.statistics['cellsRepaired']
+
+
+def printReplanningBenchmarks(layouts=('mediumSearch', 'trickySearch', 'bigSearch')):
+    """
+    Compares replanning from scratch with aStarSearch to the repaired plans of
+    search.IncrementalPlanner and to the repaired searchAgents.FoodDistanceField
+    while Pacman eats all food of a layout.  The field counts the cells it
+    searched instead of expanded nodes.
+    """
+    columns = [('layout', '%-14s'), ('replans', '%8d'), ('cost', '%6d'), ('A* nodes', '%10d'),
+               ('D* nodes', '%10d'), ('field', '%10d'), ('A* s', '%9.4f'), ('D* s', '%9.4f'),
+               ('field s', '%9.4f')]
+    printReportHeader(columns)
+    for layoutName in layouts:
+        gameState = loadGameState(layoutName)
+        (_, aStarCost, aStarExpanded), aStarSeconds, _ = measure(eatFoodFromScratch, gameState)
+        (replans, cost, expanded), seconds, _ = measure(eatFoodIncrementally, gameState)
+        assert cost == aStarCost, 'the incremental planner ate the food on a different path'
+        (_, fieldCost, fieldCells), fieldSeconds, _ = measure(eatFoodWithDistanceField, gameState)
+        assert fieldCost == aStarCost, 'the distance field ate the food on a different path'
+        printReportRow(columns, layoutName, replans, cost, aStarExpanded, expanded, fieldCells,
+                       aStarSeconds, seconds, fieldSeconds)
+    print('')
+    columns = [('layout', '%-14s'), ('agent', '%-28s'), ('cost', '%6d'), ('seconds', '%10.4f')]
+    printReportHeader(columns)
+    for layoutName in layouts:
+        gameState = loadGameState(layoutName)
+        for agentType in (searchAgents.ClosestDotSearchAgent, searchAgents.ClosestDotFieldSearchAgent):
+            util.mutePrint()
+            try:
+                agent = agentType()
+                _, seconds = timed(agent.registerInitialState, gameState)
+            finally:
+                util.unmutePrint()
+            printReportRow(columns, layoutName, agentType.__name__, len(agent.actions), seconds)
+
+
+def benchmarkGridOperations(grid, repetitions=2000):
+    """
+    Times the grid operations a FoodSearchProblem needs for every successor
+    (copy, clearing a cell, count and hash).  Returns the microseconds each
+    operation takes on average.
+    """
+    x, y = grid.asList()[0]
+    operations = [('copy', lambda: grid.copy()),
+                  ('set', lambda: grid[x].__setitem__(y, True)),
+                  ('read', lambda: grid[x][y]),
+                  ('count', lambda: grid.count()),
+                  ('hash', lambda: hash(grid)),
+                  ('asList', lambda: grid.asList())]
+    return dict([(name, microsecondsPerCall(operation, repetitions)) for name, operation in operations])
+
+
+def printGridBenchmarks(layouts=('mediumClassic', 'bigSearch', 'bigCorners')):
+    "Compares the list of lists Grid with BitGrid on the food of a few layouts"
+    names = ['copy', 'set', 'read', 'count', 'hash', 'asList']
+    columns = [('layout', '%-14s'), ('grid', '%-8s')] + [(name + ' us', '%9.2f') for name in names]
+    printReportHeader(columns)
+    for layoutName in layouts:
+        food = layout.getLayout(layoutName).food
+        for gridName, grid in (('Grid', food.copy()), ('BitGrid', game.toBitGrid(food))):
+            results = benchmarkGridOperations(grid)
+            printReportRow(columns, layoutName, gridName, *[results[name] for name in names])
+
+
+def randomPlayouts(layoutName, numGames=5, seed=188):
+    """
+    Plays numGames games of random moves for all agents of a layout and
+    returns every GameState that was generated.
+    """
+    rng = random.Random(seed)
+    lay = layout.getLayout(layoutName)
+    states = []
+    for _ in range(numGames):
+        state = pacman.GameState()
+        state.initialize(lay, lay.getNumGhosts())
+        while not (state.isWin() or state.isLose()):
+            for agentIndex in range(state.getNumAgents()):
+                if state.isWin() or state.isLose():
+                    break
+                state = state.generateSuccessor(agentIndex, rng.choice(state.getLegalActions(agentIndex)))
+                states.append(state)
+    return states
+
+
+def expandLookahead(state, depth):
+    """
+    Generates the successors of state for depth plies of all agents, like an
+    expectimax agent, and returns all of them.
+    """
+    layer, successors = [state], []
+    for ply in range(depth):
+        agentIndex = ply % state.getNumAgents()
+        nextLayer = []
+        for parent in layer:
+            if parent.isWin() or parent.isLose():
+                continue
+            for action in parent.getLegalActions(agentIndex):
+                nextLayer.append(parent.generateSuccessor(agentIndex, action))
+        successors += nextLayer
+        layer = nextLayer
+    return successors
+
+
+def printSuccessorBenchmarks(layoutName='mediumClassic', depths=(3, 6), numRoots=20):
+    """
+    Expands lookahead trees from states of random games on a layout and
+    reports the time and the memory kept alive per generated successor
+    (the successors are kept, like in the tree of an expectimax search).
+    """
+    roots = randomPlayouts(layoutName, numGames=1)[:numRoots]
+    columns = [('layout', '%-16s'), ('depth', '%6d'), ('successors', '%11d'),
+               ('successor us', '%14.2f'), ('bytes/successor', '%16.1f')]
+    printReportHeader(columns)
+    for depth in depths:
+        pacman.GameState.getAndResetExplored()
+        successors, seconds = timed(lambda: [expandLookahead(root, depth) for root in roots])
+        count = sum(len(tree) for tree in successors)
+        del successors
+        pacman.GameState.getAndResetExplored()
+
+        tracemalloc.start()
+        try:
+            successors = [expandLookahead(root, depth) for root in roots]
+            pacman.GameState.getAndResetExplored()
+            currentBytes, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del successors
+        printReportRow(columns, layoutName, depth, count, 1e6 * seconds / count, currentBytes / float(count))
+
+
+def printExploredTrackingBenchmarks(layoutName='mediumClassic', numGames=20):
+    """
+    Plays random games with every explored tracking mode of GameState and
+    reports the time per successor and the memory the tracking keeps alive
+    afterwards.  A sample without a bound is what GameState always did.
+    """
+    columns = [('tracking', '%-24s'), ('successors', '%11d'), ('successor us', '%14.2f'), ('kept KiB', '%12.1f')]
+    printReportHeader(columns)
+    for mode, sampleSize in ((None, 0), ('counts', 0), ('sample', 1000), ('sample', float('inf'))):
+        # Timed without tracemalloc, whose hooks would swamp the difference
+        pacman.GameState.getAndResetExplored()
+        with pacman.GameState.trackExplored(mode, sampleSize):
+            states, seconds = timed(randomPlayouts, layoutName, numGames)
+        pacman.GameState.getAndResetExplored()
+        tracemalloc.start()
+        try:
+            with pacman.GameState.trackExplored(mode, sampleSize):
+                randomPlayouts(layoutName, numGames)
+            keptBytes, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        name = str(mode) if mode != 'sample' else 'sample of %s' % sampleSize
+        printReportRow(columns, name, len(states), 1e6 * seconds / len(states), keptBytes / 1024.0)
+    pacman.GameState.getAndResetExplored()
+
+
+def printGameStateBenchmarks(layouts=('mediumClassic', 'trickyClassic', 'originalClassic')):
+    """
+    Times generateSuccessor in random games and hashing and comparing the
+    GameStates they produce.
+    """
+    columns = [('layout', '%-16s'), ('states', '%8d'), ('successor us', '%14.2f'),
+               ('hash us', '%10.2f'), ('eq us', '%10.2f')]
+    printReportHeader(columns)
+    for layoutName in layouts:
+        states, successorTime = timed(randomPlayouts, layoutName)
+        pacman.GameState.getAndResetExplored()
+        copies = [state.deepCopy() for state in states]
+
+        def hashAll():
+            for state in states:
+                hash(state)
+
+        def compareAll():
+            for state, other in zip(states, states[1:]):
+                state == other
+            for state, copy in zip(states, copies):
+                state == copy
+        _, hashTime = timed(hashAll)
+        _, eqTime = timed(compareAll)
+        printReportRow(columns, layoutName, len(states), 1e6 * successorTime / len(states),
+                       1e6 * hashTime / len(states), 1e6 * eqTime / (2 * len(states) - 1))
+
+
+def benchmarkAllocation(makeObject, numObjects):
+    """
+    Creates numObjects objects with makeObject and returns the time per
+    object in microseconds and the bytes each object keeps allocated.
+    """
+    objects, seconds = timed(lambda: [makeObject() for i in range(numObjects)])
+    del objects
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        objects = [makeObject() for i in range(numObjects)]
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # do not count the list that holds the objects
+    listBytes = sys.getsizeof(objects)
+    del objects
+    return 1e6 * seconds / numObjects, (after - before - listBytes) / float(numObjects)
+
+
+def printObjectBenchmarks(layoutName='mediumClassic', numObjects=20000):
+    """
+    Reports the size and the creation time of the objects that every
+    generated GameState allocates.  The objects share their contents
+    (positions, lists, grids) with one state of the layout, so only the
+    objects themselves are counted.
+    """
+    data = loadGameState(layoutName).data
+    agentState = data.agentStates[0]
+    configuration = agentState.configuration
+    position = configuration.pos
+    walls = data.layout.walls
+    food = data.food
+    objects = [('Configuration', lambda: game.Configuration(position, 'North')),
+               ('AgentState', lambda: agentState.copy()),
+               ('GameStateData', lambda: game.GameStateData(data)),
+               ('Grid', lambda: walls.shallowCopy()),
+               ('BitGrid', lambda: food.copy()),
+               ('BitGridColumn', lambda: food[1])]
+    if game.NUMPY_AVAILABLE:
+        numpyGrid = game.NumpyGrid(walls.width, walls.height)
+        objects.append(('NumpyGrid', lambda: numpyGrid.shallowCopy()))
+    columns = [('object', '%-16s'), ('bytes', '%12.1f'), ('create us', '%12.3f')]
+    printReportHeader(columns)
+    for name, makeObject in objects:
+        createMicros, objectBytes = benchmarkAllocation(makeObject, numObjects)
+        printReportRow(columns, name, objectBytes, createMicros)
+
+
+def printMazeDistanceBenchmarks(layouts=('trickySearch', 'bigSearch', 'mediumMaze', 'bigMaze'), numPairs=200):
+    """
+    Compares a breadth first search per maze distance with the MazeDistances
+    of searchAgents: the time to compute the rows of all cells, their memory
+    and the time of a distance once the rows exist.
+    """
+    columns = [('layout', '%-14s'), ('cells', '%6d'), ('bfs us/call', '%13.1f'), ('build ms', '%12.2f'),
+               ('rows KiB', '%12.1f'), ('lookup us', '%12.3f')]
+    printReportHeader(columns)
+    for layoutName in layouts:
+        gameState = loadGameState(layoutName)
+        cells = gameState.getWalls().asList(False)
+        rand = random.Random(188)
+        pairs = [(rand.choice(cells), rand.choice(cells)) for i in range(numPairs)]
+
+        def searchAll():
+            for point1, point2 in pairs:
+                problem = searchAgents.PositionSearchProblem(gameState, start=point1, goal=point2,
+                                                             warn=False, visualize=False)
+                search.breadthFirstSearch(problem)
+        _, bfsSeconds = timed(searchAll)
+
+        distances = searchAgents.MazeDistances(gameState.getWalls())
+        distances.buildAll()
+        _, lookupSeconds = timed(lambda: [distances.getDistance(point1, point2) for point1, point2 in pairs])
+        printReportRow(columns, layoutName, len(cells), 1e6 * bfsSeconds / numPairs,
+                       1000 * distances.statistics['buildSeconds'], distances.statistics['bytes'] / 1024.0,
+                       1e6 * lookupSeconds / numPairs)
+
+
+def farthestFoodHeuristic(state, problem):
+    """
+    The previous foodHeuristic: the maze distance to the farthest food.  Kept
+    here as the baseline of the food heuristic benchmark.
+    """
+    position, foodGrid = state
+    distances = searchAgents.getMazeDistances(problem.walls)
+    foodDistances = [distances.getDistance(food, position) for food in foodGrid.asList()]
+    return max([distance for distance in foodDistances if distance != None] or [0])
+
+
+def printFoodHeuristicBenchmarks(layouts=('trickySearch', 'mediumSearch', 'bigSearch'), timeLimit=60):
+    """
+    Runs A* on the FoodSearchProblem of each layout with the farthest food
+    and the spanning tree heuristic.  Searches that take longer than
+    timeLimit seconds are stopped and report the nodes expanded so far.
+    """
+    columns = [('layout', '%-14s'), ('heuristic', '%-22s'), ('cost', '%8s'), ('expanded', '%10d'),
+               ('seconds', '%9.2f'), ('trees', '%8d')]
+    printReportHeader(columns)
+    for layoutName in layouts:
+        gameState = loadGameState(layoutName)
+        for heuristic in (farthestFoodHeuristic, searchAgents.foodHeuristic):
+            problem = searchAgents.FoodSearchProblem(gameState)
+
+            def run():
+                try:
+                    actions = util.TimeoutFunction(search.aStarSearch, timeLimit)(problem, heuristic)
+                    return '%d' % problem.getCostOfActions(actions)
+                except util.TimeoutFunctionException:
+                    return 'timeout'
+            cost, seconds = timed(run)
+            trees = len(problem.heuristicInfo.get('treeWeights', {}))
+            printReportRow(columns, layoutName, heuristic.__name__, cost, problem._expanded, seconds, trees)
+
+
+class LegacyPositionSearchProblem(searchAgents.PositionSearchProblem):
+    """
+    PositionSearchProblem with its original getSuccessors, which finds the
+    moves and calls costFn on every expansion.  Kept here as the baseline of
+    the expansion benchmark.
+    """
+    def getSuccessors(self, state):
+        successors = []
+        for action in [game.Directions.NORTH, game.Directions.SOUTH, game.Directions.EAST, game.Directions.WEST]:
+            x, y = state
+            dx, dy = game.Actions.directionToVector(action)
+            nextx, nexty = int(x + dx), int(y + dy)
+            if not self.walls[nextx][nexty]:
+                nextState = (nextx, nexty)
+                cost = self.costFn(nextState)
+                successors.append((nextState, action, cost))
+        self._expanded += 1
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+        return successors
+
+
+def printExpansionBenchmarks(layoutName='bigMaze', rounds=20):
+    """
+    Reports the expansions per second of PositionSearchProblem and of its
+    original getSuccessors, once calling getSuccessors on every free cell
+    rounds times (each round with a new problem, like the many problems
+    of ClosestDotSearchAgent) and once inside a search.
+    """
+    gameState = loadGameState(layoutName)
+    cells = gameState.getWalls().asList(False)
+    stayEastCost = lambda position: .5 ** position[0]
+    columns = [('problem', '%-30s'), ('costFn', '%-10s'), ('run', '%-8s'), ('expanded', '%10d'),
+               ('expansions/s', '%14.0f')]
+    printReportHeader(columns)
+    for problemType in (LegacyPositionSearchProblem, searchAgents.PositionSearchProblem):
+        for costName, costFn in (('unitCost', searchAgents.unitCost), ('stayEast', stayEastCost)):
+            def newProblem():
+                return problemType(gameState, costFn=costFn, warn=False, visualize=False)
+
+            def expandAll():
+                for i in range(rounds):
+                    problem = newProblem()
+                    for cell in cells:
+                        problem.getSuccessors(cell)
+            _, seconds = timed(expandAll)
+            printReportRow(columns, problemType.__name__, costName, 'cells', rounds * len(cells),
+                           rounds * len(cells) / seconds)
+            problem = newProblem()
+            _, seconds = timed(search.uniformCostSearch, problem)
+            printReportRow(columns, problemType.__name__, costName, 'ucs', problem._expanded,
+                           problem._expanded / seconds)
+
+
+def printCorridorBenchmarks(layouts=('mediumMaze', 'bigMaze', 'openMaze', 'contoursMaze')):
+    """
+    Describes the JunctionGraph of each layout and compares the nodes that
+    ucs and A* (with the Manhattan distance) expand on its
+    PositionSearchProblem with the junctions corridorSearch expands.
+    """
+    columns = [('layout', '%-14s'), ('cells', '%6d'), ('junctions', '%10d'), ('corridors', '%10d'),
+               ('build ms', '%9.2f')]
+    printReportHeader(columns)
+    for layoutName in layouts:
+        statistics = search.JunctionGraph(loadGameState(layoutName).getWalls()).statistics
+        printReportRow(columns, layoutName, statistics['cells'], statistics['junctions'],
+                       statistics['corridors'], 1000 * statistics['buildSeconds'])
+    print('')
+    columns = [('layout', '%-14s'), ('search', '%-26s'), ('cost', '%6d'), ('expanded', '%10d'),
+               ('seconds', '%9.4f')]
+    printReportHeader(columns)
+    heuristic = searchAgents.manhattanHeuristic
+    runs = (('ucs', lambda problem: search.uniformCostSearch(problem)),
+            ('corridorSearch', lambda problem: search.corridorSearch(problem)),
+            ('astar manhattan', lambda problem: search.aStarSearch(problem, heuristic)),
+            ('corridorSearch manhattan', lambda problem: search.corridorSearch(problem, heuristic)))
+    for layoutName in layouts:
+        gameState = loadGameState(layoutName)
+        searchAgents.getSuccessorTable(gameState.getWalls())
+        search.getJunctionGraph(gameState.getWalls())
+        for name, run in runs:
+            problem = searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False)
+            actions, seconds = timed(run, problem)
+            expanded = problem._searchStatistics['expanded'] if name.startswith('corridor') else problem._expanded
+            printReportRow(columns, layoutName, name, problem.getCostOfActions(actions), expanded, seconds)
+
+
+def printPackingBenchmarks(layouts=('bigSearch', 'bigMaze', 'originalClassic'), repetitions=200):
+    """
+    Compares the legacy packBits and reconstituteGrid with the bytes based
+    ones on the food and walls of a few layouts; the payload is the size
+    of the pickled representation.
+    """
+    columns = [('grid', '%-28s'), ('pack us', '%10.1f'), ('new us', '%10.1f'), ('unpack us', '%10.1f'),
+               ('new us', '%10.1f'), ('payload bytes', '%14s')]
+    printReportHeader(columns)
+    for layoutName in layouts:
+        lay = layout.getLayout(layoutName)
+        for gridName, grid in (('food', lay.food), ('walls', lay.walls)):
+            legacyBits, bits = legacyPackBits(grid), grid.packBits()
+            times = [microsecondsPerCall(lambda: function(argument), repetitions)
+                     for function, argument in ((legacyPackBits, grid), (game.Grid.packBits, grid),
+                                                (legacyReconstituteGrid, legacyBits), (game.reconstituteGrid, bits))]
+            printReportRow(columns, '%s %s %dx%d' % (layoutName, gridName, grid.width, grid.height),
+                           times[0], times[1], times[2], times[3],
+                           '%d -> %4d' % (len(pickle.dumps(legacyBits)), len(pickle.dumps(bits))))
+
+
+def generateLayoutText(width, height, seed=188):
+    "A random layout (walls, food, capsules, Pacman and two ghosts) surrounded by walls"
+    rng = random.Random(seed)
+    rows = []
+    for y in range(height):
+        row = []
+        for x in range(width):
+            if x in (0, width - 1) or y in (0, height - 1):
+                row.append('%')
+            else:
+                row.append(rng.choice('%%%...   o'))
+        rows.append(row)
+    rows[1][1], rows[1][2], rows[2][1] = 'P', 'G', 'G'
+    return [''.join(row) for row in rows]
+
+
+def printNumpyGridBenchmarks(sizes=(100, 200, 400)):
+    """
+    Compares the list of lists Grid with NumpyGrid on big generated layouts:
+    building the Layout and the whole-board operations on its food.
+    """
+    if not game.NUMPY_AVAILABLE:
+        print('NumPy is not installed, there is no NumpyGrid to benchmark')
+        return
+    names = ['layout', 'count', 'asList', 'copy', 'hash', 'packBits', 'unpack']
+    columns = [('size', '%-11s'), ('grid', '%-10s')] + [(name + ' ms', '%10.2f') for name in names]
+    printReportHeader(columns)
+    for size in sizes:
+        layoutText = generateLayoutText(size, size)
+        for useNumpy in (False, True):
+            results = {}
+            lay, results['layout'] = timed(layout.Layout, layoutText, useNumpy)
+            food = lay.food
+            bits = food.packBits()
+            operations = [('count', lambda: food.count()),
+                          ('asList', lambda: food.asList()),
+                          ('copy', lambda: food.copy()),
+                          ('hash', lambda: hash(food)),
+                          ('packBits', lambda: food.packBits()),
+                          ('unpack', lambda: type(food)(size, size, bitRepresentation=bits[2:]))]
+            for name, operation in operations:
+                _, results[name] = timed(operation)
+            printReportRow(columns, '%dx%d' % (size, size), type(food).__name__,
+                           *[1000 * results[name] for name in names])
+
+
+# The benchmarks -b runs: a name and the functions that print its reports
+BENCHMARKS = [
+    ('search', [printSearchBenchmarks]),
+    ('queues', [printPriorityQueueBenchmarks, printBucketQueueBenchmarks]),
+    ('jps', [printJumpPointBenchmarks]),
+    ('replan', [printReplanningBenchmarks]),
+    ('grids', [printGridBenchmarks]),
+    ('gamestates', [printGameStateBenchmarks, printSuccessorBenchmarks, printExploredTrackingBenchmarks]),
+    ('objects', [printObjectBenchmarks, printSuccessorBenchmarks]),
+    ('distances', [printMazeDistanceBenchmarks]),
+    ('heuristics', [printFoodHeuristicBenchmarks]),
+    ('expansions', [printExpansionBenchmarks]),
+    ('corridors', [printCorridorBenchmarks]),
+    ('numpy', [printNumpyGridBenchmarks]),
+    ('packing', [printPackingBenchmarks]),
+]
+
+
+def readCommand(argv):
+    "Processes the command used to run the benchmarks from the command line."
+    from optparse import OptionParser
+    parser = OptionParser('USAGE:      python searchBenchmarks.py <options>')
+    parser.add_option('-l', '--layouts', dest='layouts', default=None,
+                      help='Comma separated layouts of the search benchmarks [Default: all]')
+    parser.add_option('-f', '--functions', dest='functions', default=None,
+                      help='Comma separated search functions of the search benchmarks [Default: all]')
+    parser.add_option('-b', '--benchmark', dest='benchmark', default='search',
+                      help='The benchmark to run: %s [Default: search]' % ', '.join([name for name, _ in BENCHMARKS]))
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    if options.benchmark not in dict(BENCHMARKS):
+        raise Exception('Unknown benchmark: ' + options.benchmark)
+    return options
+
+
+def runBenchmark(name, layouts=None, functions=None):
+    """
+    Prints the reports of the benchmark name, separated by empty lines.
+    layouts and functions select some of the SEARCH_BENCHMARKS of 'search'.
+    """
+    for index, printBenchmarks in enumerate(dict(BENCHMARKS)[name]):
+        if index > 0:
+            print('')
+        if printBenchmarks == printSearchBenchmarks:
+            printSearchBenchmarks(layouts, functions)
+        else:
+            printBenchmarks()
+
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    runBenchmark(options.benchmark,
+                 options.layouts and options.layouts.split(','),
+                 options.functions and options.functions.split(','))
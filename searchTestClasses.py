@@ -14,12 +14,15 @@
 
 import sys
 import re
+import heapq
+import random
 import testClasses
 import textwrap
 
 # import project specific code
 import layout
 import pacman
+import util
 from search import SearchProblem
 
 # helper function for printing solutions in solution files
@@ -821,3 +824,348 @@ class CornerHeuristicPacman(testClasses.TestCase):
         handle.close()
         return True
 
+
+
+# The util.PriorityQueue of the original project, whose update scans the heap
+class ScanPriorityQueue:
+
+    def __init__(self):
+        self.heap = []
+        self.count = 0
+
+    def push(self, item, priority):
+        heapq.heappush(self.heap, (priority, self.count, item))
+        self.count += 1
+
+    def pop(self):
+        (_, _, item) = heapq.heappop(self.heap)
+        return item
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def update(self, item, priority):
+        for index, (p, c, i) in enumerate(self.heap):
+            if i == item:
+                if p <= priority:
+                    break
+                del self.heap[index]
+                self.heap.append((priority, c, item))
+                heapq.heapify(self.heap)
+                break
+        else:
+            self.push(item, priority)
+
+def runQueueOperations(queue, operations):
+    "Applies (operation, item, priority) triples to queue, then empties it; returns the popped items"
+    popped = []
+    for operation, item, priority in operations:
+        if operation == 'push':
+            queue.push(item, priority)
+        elif operation == 'update':
+            queue.update(item, priority)
+        elif not queue.isEmpty():
+            popped.append(queue.pop())
+    while not queue.isEmpty():
+        popped.append(queue.pop())
+    return popped
+
+def randomQueueOperations(rng):
+    "Returns random operations on a few items"
+    operations = []
+    for _ in range(rng.randrange(1, 40)):
+        r = rng.random()
+        item = rng.choice('abcdef')
+        priority = rng.randrange(6)
+        if r < 0.3:
+            operations.append(('push', item, priority))
+        elif r < 0.7:
+            operations.append(('update', item, priority))
+        else:
+            operations.append(('pop', None, None))
+    return operations
+
+def pushesTwice(operations):
+    "Whether operations push an item while it is still in the queue"
+    queue = ScanPriorityQueue()
+    for operation, item, priority in operations:
+        if operation == 'push' and item in [i for (_, _, i) in queue.heap]:
+            return True
+        if operation == 'push':
+            queue.push(item, priority)
+        elif operation == 'update':
+            queue.update(item, priority)
+        elif not queue.isEmpty():
+            queue.pop()
+    return False
+
+# Checks a util queue against ScanPriorityQueue
+class PriorityQueueTest(testClasses.TestCase):
+
+    def __init__(self, question, testDict):
+        super(PriorityQueueTest, self).__init__(question, testDict)
+        self.queueClassName = testDict['queueClass']
+        self.operations = []
+        for line in testDict['operations'].split('\n'):
+            if line.strip():
+                words = line.split() + [None, None]
+                priority = None if words[2] == None else int(words[2])
+                self.operations.append((words[0], words[1], priority))
+        self.randomRuns = int(testDict.get('randomRuns', '0'))
+
+    def execute(self, grades, moduleDict, solutionDict):
+        queueClass = getattr(util, self.queueClassName)
+        gold_popped = solutionDict['popped'].split()
+        popped = runQueueOperations(queueClass(), self.operations)
+        if popped != gold_popped:
+            grades.addMessage('FAIL: %s' % self.path)
+            grades.addMessage('\t%s popped:\t%s' % (self.queueClassName, ' '.join(popped)))
+            grades.addMessage('\tcorrect popped:\t%s' % ' '.join(gold_popped))
+            return False
+
+        # random operations must pop the items in the same order as the
+        # original queue; once an item is pushed while it is still in the
+        # queue, which of its entries update lowers depends on the order of
+        # the heap, so those runs are skipped
+        for run in range(self.randomRuns):
+            operations = randomQueueOperations(random.Random(run))
+            if pushesTwice(operations):
+                continue
+            popped = runQueueOperations(queueClass(), operations)
+            gold_popped = runQueueOperations(ScanPriorityQueue(), operations)
+            if popped != gold_popped:
+                grades.addMessage('FAIL: %s' % self.path)
+                grades.addMessage('\toperations:\t%s' % operations)
+                grades.addMessage('\t%s popped:\t%s' % (self.queueClassName, ' '.join(popped)))
+                grades.addMessage('\tcorrect popped:\t%s' % ' '.join(gold_popped))
+                return False
+
+        grades.addMessage('PASS: %s' % self.path)
+        grades.addMessage('\tqueue:\t\t%s' % self.queueClassName)
+        grades.addMessage('\trandom runs:\t%s' % self.randomRuns)
+        return True
+
+    def writeSolution(self, moduleDict, filePath):
+        handle = open(filePath, 'w')
+        handle.write('# This is the solution file for %s.\n' % self.path)
+        popped = runQueueOperations(ScanPriorityQueue(), self.operations)
+        handle.write('popped: "%s"\n' % ' '.join(popped))
+        handle.close()
+        return True
+
+
+# Checks that a heuristic gives a number for the states of a problem that
+# cannot be solved, because walls cut off some of the food
+class UnsolvableHeuristicTest(HeuristicTest):
+
+    def checkHeuristic(self, heuristic, problem, state, solutionCost):
+        states = [state] + [succ for succ, action, stepCost in problem.getSuccessors(state)]
+        for s in states:
+            try:
+                h = heuristic(s, problem)
+            except Exception as e:
+                return False, 'Heuristic raised %s: %s' % (type(e).__name__, e)
+            if not isinstance(h, (int, float)) or not h >= 0:
+                return False, 'Heuristic returned %s, not a number >= 0' % (h,)
+        return True, ''
+
+    def execute(self, grades, moduleDict, solutionDict):
+        searchAgents = moduleDict['searchAgents']
+        problem, state, heuristic = self.setupProblem(searchAgents)
+        passed, message = self.checkHeuristic(heuristic, problem, state, None)
+
+        if not passed:
+            grades.addMessage('FAIL: %s' % self.path)
+            grades.addMessage('%s' % message)
+            return False
+        else:
+            grades.addMessage('PASS: %s' % self.path)
+            return True
+
+    def writeSolution(self, moduleDict, filePath):
+        handle = open(filePath, 'w')
+        handle.write('# This is the solution file for %s.\n' % self.path)
+        handle.write('# The problem has no solution; the test only needs the heuristic values.\n')
+        handle.close()
+        return True
+
+
+# Checks searchAgents.mazeDistance, including points that walls separate
+class MazeDistanceTest(testClasses.TestCase):
+
+    def __init__(self, question, testDict):
+        super(MazeDistanceTest, self).__init__(question, testDict)
+        self.layoutText = testDict['layout']
+        self.layoutName = testDict['layoutName']
+        self.pairs = []
+        for line in testDict['pairs'].split('\n'):
+            if line.strip():
+                x1, y1, x2, y2 = [int(word) for word in line.split()]
+                self.pairs.append(((x1, y1), (x2, y2)))
+
+    def solution(self, searchAgents):
+        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
+        gameState = pacman.GameState()
+        gameState.initialize(lay, 0)
+        return [str(searchAgents.mazeDistance(point1, point2, gameState)) for point1, point2 in self.pairs]
+
+    def execute(self, grades, moduleDict, solutionDict):
+        searchAgents = moduleDict['searchAgents']
+        gold_distances = solutionDict['distances'].split()
+        distances = self.solution(searchAgents)
+
+        if distances != gold_distances:
+            grades.addMessage('FAIL: %s' % self.path)
+            grades.addMessage('\tstudent distances:\t%s' % ' '.join(distances))
+            grades.addMessage('\tcorrect distances:\t%s' % ' '.join(gold_distances))
+            return False
+
+        grades.addMessage('PASS: %s' % self.path)
+        grades.addMessage('\tpacman layout:\t\t%s' % self.layoutName)
+        grades.addMessage('\tdistances:\t\t%s' % ' '.join(distances))
+        return True
+
+    def writeSolution(self, moduleDict, filePath):
+        searchAgents = moduleDict['searchAgents']
+        handle = open(filePath, 'w')
+        handle.write('# This is the solution file for %s.\n' % self.path)
+        handle.write('distances: "%s"\n' % ' '.join(self.solution(searchAgents)))
+        handle.close()
+        return True
+
+
+# Checks that search functions with an optimality guarantee find paths as
+# cheap as uniform cost search (or, with a weight, at most weight times as
+# expensive)
+class OptimalSearchTest(testClasses.TestCase):
+
+    def __init__(self, question, testDict):
+        super(OptimalSearchTest, self).__init__(question, testDict)
+        self.layoutText = testDict['layout']
+        self.layoutName = testDict['layoutName']
+        self.searchProblemClassName = testDict.get('searchProblemClass', 'PositionSearchProblem')
+        # one search per line: <function> [<argument>=<value> ...]
+        self.searches = [line.split() for line in testDict['searches'].split('\n') if line.strip()]
+
+    def newProblem(self, searchAgents):
+        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
+        gameState = pacman.GameState()
+        gameState.initialize(lay, 0)
+        return getattr(searchAgents, self.searchProblemClassName)(gameState)
+
+    def runSearch(self, search, searchAgents, words):
+        "Returns the cost of the path the search in words finds, or None and an error"
+        func = getattr(search, words[0])
+        searchArgs = {}
+        for word in words[1:]:
+            name, value = word.split('=')
+            if name == 'heuristic':
+                searchArgs[name] = getattr(searchAgents, value)
+            else:
+                searchArgs[name] = searchAgents.parseSearchArgument(value)
+        problem = self.newProblem(searchAgents)
+        solution = func(problem, **searchArgs)
+        if type(solution) != type([]):
+            return None, 'The result of %s must be a list. (Instead, it is %s)' % (words[0], type(solution))
+        if not checkSolution(problem, solution):
+            return None, 'The path of %s does not lead to a goal' % words[0]
+        return problem.getCostOfActions(solution), None
+
+    def execute(self, grades, moduleDict, solutionDict):
+        search = moduleDict['search']
+        searchAgents = moduleDict['searchAgents']
+        gold_cost = float(solutionDict['cost'])
+
+        costs = []
+        for words in self.searches:
+            cost, error = self.runSearch(search, searchAgents, words)
+            if error == None:
+                weight = float(dict(word.split('=') for word in words[1:]).get('weight', '1'))
+                if cost > weight * gold_cost:
+                    error = 'The path of %s costs %s, more than %s times the optimal %s' % \
+                            (' '.join(words), cost, weight, gold_cost)
+            if error != None:
+                grades.addMessage('FAIL: %s' % self.path)
+                grades.addMessage('\t%s' % error)
+                return False
+            costs.append(cost)
+
+        grades.addMessage('PASS: %s' % self.path)
+        grades.addMessage('\tpacman layout:\t\t%s' % self.layoutName)
+        grades.addMessage('\toptimal cost:\t\t%s' % gold_cost)
+        for words, cost in zip(self.searches, costs):
+            grades.addMessage('\t%s:\t%s' % (' '.join(words), cost))
+        return True
+
+    def writeSolution(self, moduleDict, filePath):
+        search = moduleDict['search']
+        searchAgents = moduleDict['searchAgents']
+        cost, error = self.runSearch(search, searchAgents, ['uniformCostSearch'])
+        if error != None: raise Exception("Error in solution code: %s" % error)
+        handle = open(filePath, 'w')
+        handle.write('# This is the solution file for %s.\n' % self.path)
+        handle.write('# The cost of the path uniformCostSearch finds.\n')
+        handle.write('cost: "%s"\n' % cost)
+        handle.close()
+        return True
+
+
+# Checks the food count, food positions, capsule positions and the
+# incremental hash that GameStateData keeps up to date against the food
+# grid and capsule list they are derived from, along random games
+class FoodBookkeepingTest(testClasses.TestCase):
+
+    def __init__(self, question, testDict):
+        super(FoodBookkeepingTest, self).__init__(question, testDict)
+        self.layoutText = testDict['layout']
+        self.layoutName = testDict['layoutName']
+        self.games = int(testDict['games'])
+
+    def checkState(self, state):
+        "Returns an error message if the bookkeeping of state is wrong, else None"
+        food = state.getFood()
+        if state.getNumFood() != food.count():
+            return 'getNumFood() is %d, the food grid holds %d' % (state.getNumFood(), food.count())
+        if state.getFoodPositions() != set(food.asList()):
+            return 'getFoodPositions() is %s, the food grid holds %s' % \
+                   (sorted(state.getFoodPositions()), sorted(food.asList()))
+        if state.data.capsulePositions != set(state.getCapsules()):
+            return 'the capsule positions are %s, the capsules %s' % \
+                   (sorted(state.data.capsulePositions), sorted(state.getCapsules()))
+        data = state.data.deepCopy()
+        data.rehash()
+        if data._zobrist != state.data._zobrist:
+            return 'the incremental hash differs from the hash computed from scratch'
+        return None
+
+    def execute(self, grades, moduleDict, solutionDict):
+        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
+        transitions = 0
+        for gameIndex in range(self.games):
+            rng = random.Random(gameIndex)
+            state = pacman.GameState()
+            state.initialize(lay, lay.getNumGhosts())
+            error = self.checkState(state)
+            moves = 0
+            while error == None and not (state.isWin() or state.isLose()):
+                agentIndex = moves % state.getNumAgents()
+                state = state.generateSuccessor(agentIndex, rng.choice(state.getLegalActions(agentIndex)))
+                moves += 1
+                error = self.checkState(state)
+            transitions += moves
+            if error != None:
+                grades.addMessage('FAIL: %s' % self.path)
+                grades.addMessage('\tafter %d moves of game %d: %s' % (moves, gameIndex, error))
+                return False
+
+        grades.addMessage('PASS: %s' % self.path)
+        grades.addMessage('\tpacman layout:\t\t%s' % self.layoutName)
+        grades.addMessage('\tmoves checked:\t\t%d' % transitions)
+        return True
+
+    def writeSolution(self, moduleDict, filePath):
+        handle = open(filePath, 'w')
+        handle.write('# This is the solution file for %s.\n' % self.path)
+        handle.write('# The test checks the states against their own food grid and capsules.\n')
+        handle.close()
+        return True
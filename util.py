@@ -29,6 +29,7 @@
 import sys
 import inspect
 import heapq, random
+import bisect, collections
 
 
 class FixedRandom:
@@ -173,38 +174,310 @@ class PriorityQueue:
       has a priority associated with it and the client is usually interested
       in quick retrieval of the lowest-priority item in the queue. This
       data structure allows O(1) access to the lowest-priority item.
+
+      The first update, remove or `in` indexes the items by their entries,
+      and push keeps the index from then on, so update can find an item in
+      O(1) and lower its priority in O(log n): the old entry is marked as
+      removed and a replacement is pushed which keeps the insertion counter
+      (and therefore the tie-breaking order) of the old one.  Removed entries
+      are skipped lazily when they reach the top of the heap.  A queue that is
+      only pushed and popped never pays for the index.
+
+      An item pushed again while it is still in the queue has several live
+      entries; the index only counts them, and update finds the one to lower
+      with the scan of the original implementation until all of them are
+      popped.  The first unhashable item turns the index off for good, and
+      update always scans from then on.
     """
+    REMOVED = object()   # placeholder for the item of a removed entry
+
     def  __init__(self):
         self.heap = []
         self.count = 0
+        self.entries = None    # item -> its live entry, built by _indexEntries
+        self.duplicates = {}   # item -> number of live entries, for items pushed more than once
+        self.indexable = True  # False once an unhashable item was seen
+        self.removed = 0       # number of removed entries still in the heap
+
+        # fringe statistics, see getStatistics
+        self.pushes = 0
+        self.pops = 0
+        self.updates = 0
+        self.decreasedKeys = 0
+        self.staleSkipped = 0
+        self.maxSize = 0
 
     def push(self, item, priority):
-        entry = (priority, self.count, item)
-        heapq.heappush(self.heap, entry)
+        self._push(item, priority, self.count)
         self.count += 1
 
+    def _push(self, item, priority, count):
+        entry = [priority, count, item]
+        heapq.heappush(self.heap, entry)
+        if self.entries is not None:
+            self._index(item, entry)
+        self.pushes += 1
+        size = len(self.heap) - self.removed
+        if size > self.maxSize:
+            self.maxSize = size
+
     def pop(self):
-        (_, _, item) = heapq.heappop(self.heap)
+        while True:
+            (_, _, item) = heapq.heappop(self.heap)
+            if item is not PriorityQueue.REMOVED:
+                break
+            self.removed -= 1
+            self.staleSkipped += 1
+        if self.entries is not None:
+            self._unindex(item)
+        self.pops += 1
         return item
 
+    def peek(self):
+        "Returns (priority, item) of the item pop would return, without removing it"
+        while self.heap[0][2] is PriorityQueue.REMOVED:
+            heapq.heappop(self.heap)
+            self.removed -= 1
+            self.staleSkipped += 1
+        (priority, _, item) = self.heap[0]
+        return priority, item
+
+    def remove(self, item):
+        "Removes an item that was pushed (or updated) into the queue, one entry of it if it was pushed twice"
+        entries = self._indexEntries()
+        if entries is not None and item not in self.duplicates:
+            entry = entries[item]
+        else:
+            for entry in self._allEntries():
+                if entry[2] == item:
+                    break
+            else:
+                raise KeyError(item)
+        if entries is not None:
+            self._unindex(item)
+        entry[2] = PriorityQueue.REMOVED
+        self.removed += 1
+
     def isEmpty(self):
-        return len(self.heap) == 0
+        return len(self.heap) == self.removed
+
+    def __len__(self):
+        return len(self.heap) - self.removed
+
+    def __contains__(self, item):
+        "Whether an item is in the queue"
+        entries = self._indexEntries()
+        if entries is None:
+            return any(entry[2] == item for entry in self._allEntries())
+        return item in entries
 
     def update(self, item, priority):
         # If item already in priority queue with higher priority, update its priority and rebuild the heap.
         # If item already in priority queue with equal or lower priority, do nothing.
         # If item not in priority queue, do the same thing as self.push.
+        self.updates += 1
+        entries = self.entries
+        if entries is None:
+            entries = self._indexEntries()
+        if entries is not None:
+            try:
+                entry = entries.get(item)
+            except TypeError:
+                self._stopIndexing()
+                entries = None
+        if entries is None or (self.duplicates and item in self.duplicates):
+            return self._updateByScan(item, priority)
+        if entry is None:
+            self.push(item, priority)
+        elif entry[0] > priority:
+            # lazily remove the old entry; the replacement keeps its counter
+            entry[2] = PriorityQueue.REMOVED
+            self.removed += 1
+            self.decreasedKeys += 1
+            del entries[item]
+            self._push(item, priority, entry[1])
+
+    def _allEntries(self):
+        "The entries in the queue, including removed ones"
+        return self.heap
+
+    def _indexEntries(self):
+        "Returns self.entries, indexing the items in the queue the first time it is needed (None if it cannot be)"
+        if self.entries is None and self.indexable:
+            self.entries = {}
+            for entry in self._allEntries():
+                if entry[2] is not PriorityQueue.REMOVED:
+                    self._index(entry[2], entry)
+                    if not self.indexable:
+                        break
+        return self.entries
+
+    def _index(self, item, entry):
+        "Adds a live entry of item to the index"
+        try:
+            if item in self.entries:
+                # several live entries: only count them, update scans for this item
+                self.duplicates[item] = self.duplicates.get(item, 1) + 1
+            self.entries[item] = entry
+        except TypeError:
+            self._stopIndexing()
+
+    def _unindex(self, item):
+        "Removes a live entry of item that was popped or removed from the index"
+        live = self.duplicates.get(item)
+        if live == None:
+            del self.entries[item]
+        elif live > 1:
+            self.duplicates[item] = live - 1
+        else:
+            del self.duplicates[item]
+            del self.entries[item]
+
+    def _stopIndexing(self):
+        "Drops the index for good after an unhashable item was seen"
+        self.entries, self.duplicates, self.indexable = None, {}, False
+
+    def _updateByScan(self, item, priority):
+        "update for items that cannot be looked up in self.entries: unhashable or pushed more than once"
         for index, (p, c, i) in enumerate(self.heap):
             if i == item:
                 if p <= priority:
                     break
                 del self.heap[index]
-                self.heap.append((priority, c, item))
+                self.heap.append([priority, c, item])
                 heapq.heapify(self.heap)
+                self.decreasedKeys += 1
                 break
         else:
             self.push(item, priority)
 
+    def getStatistics(self):
+        """
+        Returns a dictionary describing how the queue was used: the number of
+        pushes, pops and update calls, how many updates lowered a priority,
+        how many removed entries pop had to skip and the largest number of
+        items that were in the queue at the same time.
+        """
+        return {'pushes': self.pushes,
+                'pops': self.pops,
+                'updates': self.updates,
+                'decreasedKeys': self.decreasedKeys,
+                'staleSkipped': self.staleSkipped,
+                'maxSize': self.maxSize}
+
+class BucketQueue(PriorityQueue):
+    """
+      A PriorityQueue for integral priorities, like the path costs of
+      problems with small integer step costs.  Every distinct priority gets
+      a FIFO bucket of entries, so push and pop take O(1) instead of
+      O(log n); only the few distinct priorities are kept in a heap.
+
+      Items of equal priority are popped in the same order as from a
+      PriorityQueue: by their insertion counter.  Pushed items arrive in that
+      order and are appended; an item whose priority was lowered by update
+      keeps its old counter and is inserted at its place in the new bucket.
+
+      The first time a priority is not integral the queue moves its entries
+      into the heap of PriorityQueue and behaves exactly like one from then
+      on, so searches can use it without knowing their step costs.
+    """
+    def  __init__(self):
+        PriorityQueue.__init__(self)
+        self.buckets = {}   # priority -> deque of entries, None once the heap is used
+        self.keys = []      # heap of the priorities that have a bucket
+        self.stored = 0     # number of entries in the buckets
+
+    def _push(self, item, priority, count):
+        buckets = self.buckets
+        if buckets is None:
+            return PriorityQueue._push(self, item, priority, count)
+        if priority.__class__ is not int and not (priority.__class__ is float and priority.is_integer()):
+            self._useHeap()
+            return PriorityQueue._push(self, item, priority, count)
+
+        entry = [priority, count, item]
+        bucket = buckets.get(priority)
+        if bucket is None:
+            bucket = buckets[priority] = collections.deque()
+            heapq.heappush(self.keys, priority)
+        if bucket and bucket[-1][1] > count:
+            bisect.insort(bucket, entry)  # an updated item keeps its place among the ties
+        else:
+            bucket.append(entry)
+        self.stored += 1
+        if self.entries is not None:
+            self._index(item, entry)
+        self.pushes += 1
+        size = self.stored - self.removed
+        if size > self.maxSize:
+            self.maxSize = size
+
+    def _popEntry(self):
+        "Removes and returns the first entry of the lowest bucket"
+        priority = self.keys[0]
+        bucket = self.buckets[priority]
+        entry = bucket.popleft()
+        if not bucket:
+            del self.buckets[priority]
+            heapq.heappop(self.keys)
+        self.stored -= 1
+        return entry
+
+    def pop(self):
+        if self.buckets is None:
+            return PriorityQueue.pop(self)
+        while True:
+            priority = self.keys[0]
+            bucket = self.buckets[priority]
+            (_, _, item) = bucket.popleft()
+            if not bucket:
+                del self.buckets[priority]
+                heapq.heappop(self.keys)
+            self.stored -= 1
+            if item is not PriorityQueue.REMOVED:
+                break
+            self.removed -= 1
+            self.staleSkipped += 1
+        if self.entries is not None:
+            self._unindex(item)
+        self.pops += 1
+        return item
+
+    def peek(self):
+        if self.buckets is None:
+            return PriorityQueue.peek(self)
+        while self.buckets[self.keys[0]][0][2] is PriorityQueue.REMOVED:
+            self._popEntry()
+            self.removed -= 1
+            self.staleSkipped += 1
+        (priority, _, item) = self.buckets[self.keys[0]][0]
+        return priority, item
+
+    def isEmpty(self):
+        return len(self.heap) + self.stored == self.removed
+
+    def __len__(self):
+        return len(self.heap) + self.stored - self.removed
+
+    def _allEntries(self):
+        if self.buckets is None:
+            return self.heap
+        return self.heap + [entry for bucket in self.buckets.values() for entry in bucket]
+
+    def _updateByScan(self, item, priority):
+        # unhashable and duplicate items are rare, the heap already knows how to scan
+        self._useHeap()
+        PriorityQueue._updateByScan(self, item, priority)
+
+    def _useHeap(self):
+        "Moves all entries into the heap of PriorityQueue and stops using buckets"
+        if self.buckets is None:
+            return
+        for bucket in self.buckets.values():
+            self.heap.extend(bucket)
+        heapq.heapify(self.heap)
+        self.buckets, self.keys, self.stored = None, [], 0
+
 class PriorityQueueWithFunction(PriorityQueue):
     """
     Implements a priority queue with the same push/pop signature of the
@@ -445,6 +718,24 @@ class Counter(dict):
             addend[key] = -1 * y[key]
         return addend
 
+MAX_CACHED_WALLS = 16  # the number of walls grids whose tables are kept, see cachedForWalls
+
+def cachedForWalls(cache, walls, makeTable):
+    """
+    Returns the table that makeTable(walls) made for a walls grid the last
+    time, so everything that asks for the same grid object shares it.  The
+    cache is a dictionary id(walls) -> (walls, table) that keeps the tables
+    of the most recent MAX_CACHED_WALLS grids.  The walls must not change.
+    """
+    entry = cache.get(id(walls))
+    if entry == None or entry[0] is not walls:
+        entry = (walls, makeTable(walls))
+        cache.pop(id(walls), None)
+        while len(cache) >= MAX_CACHED_WALLS:
+            del cache[next(iter(cache))]
+        cache[id(walls)] = entry
+    return entry[1]
+
 def raiseNotDefined():
     fileName = inspect.stack()[1][1]
     line = inspect.stack()[1][2]